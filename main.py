@@ -4,8 +4,6 @@ Main entry point for the Artwork Fetcher CLI.
 """
 
 import argparse
-from yumebyo.components.webMetadataFetcher import init_browser, close_browser
-from yumebyo.yumebyo import yumebyo
 
 
 def main():
@@ -19,23 +17,49 @@ def main():
         required=True,
         help="Path to your music folder"
     )
+
+    parser.add_argument(
+        '--no-browser',
+        action='store_true',
+        help="Do not launch Playwright; only read artwork pages over plain HTTP"
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Do not reuse or store downloaded covers, scan results and YouTube Music lookups in ~/.cache/artwork_fetcher"
+    )
     args = parser.parse_args()
+
+    # Imported after argument parsing so --help and usage errors return immediately
+    from yumebyo.components.webMetadataFetcher import init_browser, close_browser
+    from yumebyo.components.http_client import close_session
+    from yumebyo.components.cover_cache import close_cover_cache
+    from yumebyo.components.scan_cache import close_scan_cache
+    from yumebyo.components.youtube_music.thumbnail_url_cache import close_thumbnail_url_cache
+    from yumebyo.yumebyo import yumebyo
     
     # Initialize browser
-    init_browser()
+    if not args.no_browser:
+        init_browser()
 
     try:
         results = yumebyo(
             folder_path=args.dir,
             recursive=True,
-            verbose=True
+            verbose=True,
+            use_cover_cache=not args.no_cache
         )
         print("\nProcessing complete!")
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        # Clean up browser
+        # Clean up browser, pooled HTTP connections and the on-disk caches
         close_browser()
+        close_session()
+        close_cover_cache()
+        close_scan_cache()
+        close_thumbnail_url_cache()
 
 
 if __name__ == "__main__":
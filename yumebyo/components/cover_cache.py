@@ -0,0 +1,73 @@
+"""
+Persistent cache of downloaded cover images keyed by (artist, album).
+
+Tracks from the same album share one cover, so once it has been downloaded
+for one track the others, and later runs over the same library, can embed
+it without touching the network. Entries are stored in a small SQLite
+database under ~/.cache/artwork_fetcher.
+"""
+
+import hashlib
+import os
+import sqlite3
+from typing import Optional, Tuple
+
+from .sqlite_cache import CACHE_DIR, CacheDatabase
+
+
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "covers.db")
+
+_database = CacheDatabase("cover cache", DEFAULT_CACHE_PATH, (
+    "CREATE TABLE IF NOT EXISTS covers ("
+    "key TEXT PRIMARY KEY, mime TEXT NOT NULL, data BLOB NOT NULL)",
+))
+
+
+def _cache_key(artist: str, album: str) -> str:
+    """Return the database key for an (artist, album) pair."""
+    return hashlib.sha1(f"{artist}\x00{album}".encode("utf-8")).hexdigest()
+
+
+def get_cached_cover(artist: str, album: str) -> Optional[Tuple[bytes, str]]:
+    """
+    Look up a previously stored cover.
+
+    Args:
+        artist: Artist name
+        album: Album name
+
+    Returns:
+        Tuple of (image_data, mime_type), or None if nothing is cached
+    """
+    with _database.connection() as connection:
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT data, mime FROM covers WHERE key = ?", (_cache_key(artist, album),)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+    if row is None:
+        return None
+    return bytes(row[0]), row[1]
+
+
+def store_cover(artist: str, album: str, image_data: bytes, mime_type: str):
+    """Store a downloaded cover for later lookups of the same (artist, album)."""
+    with _database.connection() as connection:
+        if connection is None:
+            return
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO covers (key, mime, data) VALUES (?, ?, ?)",
+                (_cache_key(artist, album), mime_type, sqlite3.Binary(image_data))
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: could not write to cover cache: {e}")
+
+
+def close_cover_cache():
+    """Close the cache database."""
+    _database.close()
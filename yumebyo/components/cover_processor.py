@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import io
+from operator import itemgetter
 from typing import Any, Dict, Iterable, Optional, Tuple
 
-import requests
+from .http_client import get_session, read_streamed_content
+from .resizeInto480 import area_resize_480, should_use_numba_resize
 from .youtubeMusicMetadataFetcher import fetch_primary_youtube_music_metadata
 
 try:
@@ -17,30 +19,40 @@ except ImportError:  # pragma: no cover - optional dependency warning only
     PIL_AVAILABLE = False
     print("Warning: Pillow not installed. Install it with: pip install pillow")
 
+try:
+    import pyvips  # type: ignore
+
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):  # pragma: no cover - optional accelerator, PIL is used instead
+    pyvips = None  # type: ignore
+    PYVIPS_AVAILABLE = False
+
+try:
+    import numpy as np  # type: ignore
+    from turbojpeg import TJPF_RGB, TJSAMP_420, TurboJPEG  # type: ignore
+
+    _turbo_jpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError, RuntimeError):  # pragma: no cover - optional accelerator, PIL is used instead
+    _turbo_jpeg = None
+    TURBOJPEG_AVAILABLE = False
+
 
 DEFAULT_BACKGROUND_COLOR: Tuple[int, int, int] = (0, 0, 0)
+JPEG_QUALITY = 95
 
 
 def _select_best_thumbnail(thumbnails: Iterable[Dict[str, Any]]) -> Optional[str]:
     """Return the URL for the highest-area thumbnail."""
 
-    best_url: Optional[str] = None
-    best_area = -1
-
-    for thumb in thumbnails:
-        if not isinstance(thumb, dict):
-            continue
-        url = thumb.get("url")
-        width = int(thumb.get("width", 0) or 0)
-        height = int(thumb.get("height", 0) or 0)
-        if not url or width <= 0 or height <= 0:
-            continue
-        area = width * height
-        if area > best_area:
-            best_area = area
-            best_url = url
-
-    return best_url
+    to_int = int
+    candidates = [
+        (to_int(thumb.get("width", 0) or 0) * to_int(thumb.get("height", 0) or 0), thumb["url"])
+        for thumb in thumbnails
+        if isinstance(thumb, dict) and thumb.get("url")
+    ]
+    best_area, best_url = max(candidates, key=itemgetter(0), default=(0, None))
+    return best_url if best_area > 0 else None
 
 
 def _download_image_data(url: str, timeout: int = 10) -> Optional[bytes]:
@@ -55,21 +67,21 @@ def _download_image_data(url: str, timeout: int = 10) -> Optional[bytes]:
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
+        with get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "").lower()
+            if "image" not in content_type:
+                print(
+                    f"Warning: URL {url} returned unexpected content type: {content_type or 'unknown'}"
+                )
+                return None
+
+            return read_streamed_content(response)
     except Exception as exc:  # pragma: no cover - network failure reporting only
         print(f"Error downloading thumbnail from {url}: {exc}")
         return None
 
-    content_type = response.headers.get("Content-Type", "").lower()
-    if "image" not in content_type:
-        print(
-            f"Warning: URL {url} returned unexpected content type: {content_type or 'unknown'}"
-        )
-        return None
-
-    return response.content
-
 
 def _crop_center_square(image: "Image.Image") -> "Image.Image":
     """Crop the image to a centred square prioritising the maximum available height."""
@@ -86,6 +98,52 @@ def _crop_center_square(image: "Image.Image") -> "Image.Image":
     return image.crop((left, top, right, bottom))
 
 
+def _encode_jpeg(image: "Image.Image") -> bytes:
+    """Encode an RGB image as JPEG, using libjpeg-turbo directly when available."""
+
+    if TURBOJPEG_AVAILABLE:
+        return _turbo_jpeg.encode(
+            np.asarray(image),
+            quality=JPEG_QUALITY,
+            pixel_format=TJPF_RGB,
+            jpeg_subsample=TJSAMP_420,
+        )
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+    return buffer.getvalue()
+
+
+def _is_processed_cover(image_data: bytes) -> bool:
+    """
+    Return True if the bytes are already a 480x480 RGB JPEG.
+
+    Only the image header is parsed; the pixel data is not decoded.
+    """
+
+    if not PIL_AVAILABLE:
+        return False
+
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            return image.format == "JPEG" and image.mode == "RGB" and image.size == (480, 480)
+    except Exception:
+        return False
+
+
+def _crop_and_resize_with_vips(image_data: bytes) -> bytes:
+    """
+    Centre-crop and resize the image to 480x480 JPEG with libvips.
+
+    thumbnail_buffer crops to the centre square and shrinks in one pass,
+    using shrink-on-load for JPEG sources, so the full-size image is never
+    decoded.
+    """
+
+    image = pyvips.Image.thumbnail_buffer(image_data, 480, height=480, crop="centre")
+    return image.write_to_buffer(f".jpg[Q={JPEG_QUALITY},strip,optimize_coding]")
+
+
 def download_and_process_youtube_cover(
     metadata: Dict[str, Any],
     force_480: bool = False,
@@ -120,6 +178,16 @@ def download_and_process_youtube_cover(
     if image_data is None:
         return None
 
+    # Re-encoding a cover that is already in the target shape only loses quality
+    if _is_processed_cover(image_data):
+        return image_data
+
+    if PYVIPS_AVAILABLE:
+        try:
+            return _crop_and_resize_with_vips(image_data)
+        except Exception as exc:  # pragma: no cover - fall back to Pillow below
+            print(f"Warning: libvips could not process thumbnail, using Pillow: {exc}")
+
     if not PIL_AVAILABLE:
         if force_480:
             raise ImportError(
@@ -127,15 +195,18 @@ def download_and_process_youtube_cover(
             )
         return image_data
 
-    image = Image.open(io.BytesIO(image_data)).convert("RGB")
-    image = _crop_center_square(image)
+    image = Image.open(io.BytesIO(image_data))
+    # Scale JPEGs down during decode (never below 2x the 480px target)
+    image.draft("RGB", (960, 960))
+    image = _crop_center_square(image.convert("RGB"))
 
     if image.width != 480:
-        image = image.resize((480, 480), Image.LANCZOS)
+        if should_use_numba_resize(*image.size):
+            image = Image.fromarray(area_resize_480(image))
+        else:
+            image = image.resize((480, 480), Image.LANCZOS)
 
-    buffer = io.BytesIO()
-    image.save(buffer, format="JPEG", quality=95)
-    return buffer.getvalue()
+    return _encode_jpeg(image)
 
 
 def fetch_and_process_primary_cover(
@@ -3,71 +3,286 @@ Artwork fetching, downloading, and embedding utilities.
 """
 
 import base64
-from typing import Optional
-import requests
-from .webMetadataFetcher import get_context
-from .localMusicScanner import MUTAGEN_AVAILABLE
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional
+from urllib.parse import urljoin, urlparse
+from .http_client import get_session, read_streamed_content, get_cached_image, store_cached_image
+from bs4 import BeautifulSoup
+from .webMetadataFetcher import acquire_page, is_browser_initialized
+from .localMusicScanner import MUTAGEN_AVAILABLE, open_audio_file, forget_audio_file, has_embedded_artwork
+
+if MUTAGEN_AVAILABLE:
+    from mutagen.id3 import APIC, error as ID3Error
+    from mutagen.mp3 import MP3
+    from mutagen.flac import FLAC, Picture
+    from mutagen.mp4 import MP4, MP4Cover
+    from mutagen.oggvorbis import OggVorbis
+
+try:
+    from selectolax.parser import HTMLParser  # type: ignore
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
 
 import time
 
+
+def _iter_img_sources(html: str):
+    """Yield the src attribute of every <img> in the HTML, in document order."""
+    if SELECTOLAX_AVAILABLE:
+        # selectolax parses in C and is much faster than BeautifulSoup's html.parser
+        for node in HTMLParser(html).css("img"):
+            yield node.attributes.get("src")
+    else:
+        for img in BeautifulSoup(html, "html.parser").find_all("img"):
+            yield img.get("src")
+
+
+def fetch_first_artwork_image_over_http(artwork_url: str) -> Optional[str]:
+    """
+    Read the first artwork image URL from the page HTML without running a browser.
+    
+    Only images served from a different host than the page itself are kept, so
+    the site's own icons and logos are never mistaken for artwork.
+    """
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    
+    try:
+        response = get_session().get(artwork_url, headers=headers, timeout=10)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"Warning: could not fetch artwork page over HTTP: {e}")
+        return None
+    
+    page_host = urlparse(artwork_url).netloc
+    for src in _iter_img_sources(response.text):
+        if not src:
+            continue
+        src = urljoin(artwork_url, src)
+        if urlparse(src).netloc != page_host:
+            return src
+    return None
+
+
 def fetch_first_artwork_image(artwork_url: str) -> Optional[str]:
     """
     Fetch the artwork page and extract the URL of the first available artwork image.
     
+    The page is first read over plain HTTP. The Playwright browser is only used
+    when that yields no artwork (e.g. the results are rendered by JavaScript)
+    and init_browser() has been called.
+    
     Args:
         artwork_url: URL to the artwork selection page
     
     Returns:
         URL of the first available artwork image, or None if not found
     """
-    context = get_context()
-    page = context.new_page()
+    image_url = fetch_first_artwork_image_over_http(artwork_url)
+    if image_url:
+        return image_url
+    
+    if not is_browser_initialized():
+        return None
+    
+    return fetch_first_artwork_image_in_browser(artwork_url)
 
-    try:
-        page.goto(artwork_url, wait_until="networkidle")
+
+def fetch_first_artwork_image_in_browser(artwork_url: str) -> Optional[str]:
+    """
+    Render the artwork page in the Playwright browser and return the first image URL.
+    
+    Must be called on the thread that called init_browser().
+    
+    Args:
+        artwork_url: URL to the artwork selection page
+    
+    Returns:
+        URL of the first available artwork image, or None if not found
+    """
+    with acquire_page() as page:
+        # Images, fonts and CSS are blocked by the context, so the DOM is all we wait for
+        page.goto(artwork_url, wait_until="domcontentloaded")
         try:
             page.wait_for_selector("img", timeout=10000)
         except Exception:
             print("Warning: timed out waiting for artwork images to load.")
-        imgs = page.query_selector_all("img")
-        image_urls = [img.get_attribute("src") for img in imgs if img.get_attribute("src")]
-        print(f"image_urls: {image_urls}")
-        if image_urls:
-            return image_urls[0]
-        return None
-    finally:
-        page.close()
+        # One round-trip to the browser instead of two get_attribute() calls per <img>.
+        # e.src is already resolved against the page URL, like the HTTP path's urljoin().
+        return page.eval_on_selector_all(
+            "img",
+            "els => { for (const e of els) { if (e.src) return e.src; } return null; }"
+        )
+
+
+_downloads_in_flight: Dict[str, "Future[Optional[bytes]]"] = {}
+_downloads_lock = threading.Lock()
 
 
 def download_artwork_image(image_url: str) -> Optional[bytes]:
     """
     Download an artwork image from a URL.
     
+    Tracks of one album are embedded concurrently and resolve to the same
+    image URL, so only the first caller downloads it; callers arriving while
+    that download is running wait for its result instead of fetching again.
+    
     Args:
         image_url: URL of the artwork image to download
     
     Returns:
         Image data as bytes, or None if download fails
     """
+    cached = get_cached_image(image_url)
+    if cached is not None:
+        return cached
+    
+    with _downloads_lock:
+        in_flight = _downloads_in_flight.get(image_url)
+        if in_flight is None:
+            download: "Future[Optional[bytes]]" = Future()
+            _downloads_in_flight[image_url] = download
+    if in_flight is not None:
+        return in_flight.result()
+    
+    try:
+        image_data = _download_artwork_image(image_url)
+        download.set_result(image_data)
+        return image_data
+    finally:
+        with _downloads_lock:
+            del _downloads_in_flight[image_url]
+        if not download.done():
+            download.set_result(None)
+
+
+def _download_artwork_image(image_url: str) -> Optional[bytes]:
+    """Download an artwork image and store it in the image cache."""
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
     
     try:
-        response = requests.get(image_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Check if it's actually an image
-        content_type = response.headers.get('Content-Type', '')
-        if 'image' in content_type.lower():
-            return response.content
-        else:
-            print(f"Warning: URL does not appear to be an image (Content-Type: {content_type})")
-            return None
+        with get_session().get(image_url, headers=headers, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            
+            # Check if it's actually an image before reading the body
+            content_type = response.headers.get('Content-Type', '')
+            if 'image' in content_type.lower():
+                image_data = read_streamed_content(response)
+                store_cached_image(image_url, image_data)
+                return image_data
+            else:
+                print(f"Warning: URL does not appear to be an image (Content-Type: {content_type})")
+                return None
     
     except Exception as e:
         print(f"Error downloading artwork image: {e}")
         return None
 
 
+def sniff_image_mime_type(image_data: bytes) -> Optional[str]:
+    """Return the MIME type indicated by the image's leading magic bytes, or None if unrecognised."""
+    if image_data[:3] == b'\xff\xd8\xff':
+        return 'image/jpeg'
+    if image_data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'image/png'
+    if image_data[:4] == b'RIFF' and image_data[8:12] == b'WEBP':
+        return 'image/webp'
+    if image_data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    return None
+
+
+def guess_image_mime_type(image_url: str, image_data: Optional[bytes] = None) -> str:
+    """
+    Guess the MIME type of an artwork image, defaulting to JPEG.
+    
+    CDN URLs often carry no usable extension, so the downloaded bytes are
+    checked first when given; the URL suffix is only used as a fallback.
+    """
+    if image_data:
+        sniffed = sniff_image_mime_type(image_data)
+        if sniffed:
+            return sniffed
+    
+    lower_url = image_url.lower()
+    if lower_url.endswith('.png'):
+        return 'image/png'
+    elif lower_url.endswith('.webp'):
+        return 'image/webp'
+    elif lower_url.endswith('.gif'):
+        return 'image/gif'
+    return 'image/jpeg'
+
+
+def _new_picture(image_data: bytes, mime_type: str) -> "Picture":
+    """Build a front-cover FLAC picture block."""
+    picture = Picture()
+    picture.type = 3  # Cover (front)
+    picture.mime = mime_type
+    picture.desc = 'Cover'
+    picture.data = image_data
+    return picture
+
+
+def _embed_mp3(audio_file: "MP3", image_data: bytes, mime_type: str):
+    """MP3 uses APIC (Attached Picture) frames."""
+    try:
+        audio_file.add_tags()
+    except ID3Error:
+        pass
+    
+    # Remove existing APIC frames
+    audio_file.tags.delall('APIC')
+    
+    # Add new APIC frame
+    audio_file.tags.add(APIC(
+        encoding=3,  # UTF-8
+        mime=mime_type,
+        type=3,  # Cover (front)
+        desc='Cover',
+        data=image_data
+    ))
+
+
+def _embed_flac(audio_file: "FLAC", image_data: bytes, mime_type: str):
+    """FLAC uses picture metadata."""
+    audio_file.add_picture(_new_picture(image_data, mime_type))
+
+
+def _embed_mp4(audio_file: "MP4", image_data: bytes, mime_type: str):
+    """MP4 uses the 'covr' tag."""
+    cover = MP4Cover(image_data, imageformat=MP4Cover.FORMAT_JPEG if 'jpeg' in mime_type or 'jpg' in mime_type else MP4Cover.FORMAT_PNG)
+    audio_file.tags['covr'] = [cover]
+
+
+def _embed_ogg(audio_file: "OggVorbis", image_data: bytes, mime_type: str):
+    """OGG uses METADATA_BLOCK_PICTURE."""
+    data = _new_picture(image_data, mime_type).write()
+    b64data = base64.b64encode(data).decode('ascii')
+    audio_file['METADATA_BLOCK_PICTURE'] = [b64data]
+
+
+# Embedder per mutagen file type; subclasses resolve through their MRO
+_EMBEDDERS = {
+    MP3: _embed_mp3,
+    FLAC: _embed_flac,
+    MP4: _embed_mp4,
+    OggVorbis: _embed_ogg,
+} if MUTAGEN_AVAILABLE else {}
+
+
+def _get_embedder(audio_file):
+    """Return the embedder for a loaded file's type, or None if it is unsupported."""
+    embedder = _EMBEDDERS.get(type(audio_file))
+    if embedder is None:
+        for cls in type(audio_file).__mro__[1:]:
+            embedder = _EMBEDDERS.get(cls)
+            if embedder is not None:
+                break
+    return embedder
+
+
 def embed_artwork(file_path: str, image_data: bytes, mime_type: str = 'image/jpeg') -> bool:
     """
     Embed artwork image into a music file.
@@ -84,117 +299,42 @@ def embed_artwork(file_path: str, image_data: bytes, mime_type: str = 'image/jpe
         raise ImportError("mutagen is required. Install it with: pip install mutagen")
     
     try:
-        from mutagen import File
-        from mutagen.mp3 import MP3
-        from mutagen.flac import FLAC
-        from mutagen.mp4 import MP4
-        from mutagen.oggvorbis import OggVorbis
-        
-        audio_file = File(file_path)
+        audio_file = open_audio_file(file_path)
         if audio_file is None:
             raise ValueError(f"Unsupported file format or corrupted file: {file_path}")
         
         # Embed artwork based on file type
-        if isinstance(audio_file, MP3):
-            # MP3 uses APIC (Attached Picture) frames
-            from mutagen.id3 import ID3, APIC, error as ID3Error
-            
-            try:
-                audio_file.add_tags()
-            except ID3Error:
-                pass
-            
-            # Remove existing APIC frames
-            if audio_file.tags:
-                apic_keys = [key for key in audio_file.tags.keys() if key.startswith('APIC')]
-                for key in apic_keys:
-                    del audio_file.tags[key]
-            
-            # Add new APIC frame
-            audio_file.tags.add(APIC(
-                encoding=3,  # UTF-8
-                mime=mime_type,
-                type=3,  # Cover (front)
-                desc='Cover',
-                data=image_data
-            ))
-            audio_file.save()
-            return True
-        
-        elif isinstance(audio_file, FLAC):
-            # FLAC uses picture metadata
-            from mutagen.flac import Picture
-            
-            picture = Picture()
-            picture.type = 3  # Cover (front)
-            picture.mime = mime_type
-            picture.desc = 'Cover'
-            picture.data = image_data
-            
-            audio_file.add_picture(picture)
-            audio_file.save()
-            return True
-        
-        elif isinstance(audio_file, MP4):
-            # MP4 uses 'covr' tag
-            from mutagen.mp4 import MP4Cover
-            
-            cover = MP4Cover(image_data, imageformat=MP4Cover.FORMAT_JPEG if 'jpeg' in mime_type or 'jpg' in mime_type else MP4Cover.FORMAT_PNG)
-            audio_file.tags['covr'] = [cover]
-            audio_file.save()
-            return True
-        
-        elif isinstance(audio_file, OggVorbis):
-            # OGG uses METADATA_BLOCK_PICTURE
-            from mutagen.flac import Picture
-            
-            picture = Picture()
-            picture.type = 3  # Cover (front)
-            picture.mime = mime_type
-            picture.desc = 'Cover'
-            picture.data = image_data
-            
-            data = picture.write()
-            b64data = base64.b64encode(data).decode('ascii')
-            audio_file['METADATA_BLOCK_PICTURE'] = [b64data]
-            audio_file.save()
-            return True
-        
-        else:
-            # Generic fallback - try to add as a tag
+        embedder = _get_embedder(audio_file)
+        if embedder is None:
             print(f"Warning: Unsupported file format for embedding artwork: {type(audio_file)}")
             return False
+        
+        embedder(audio_file, image_data, mime_type)
+        audio_file.save()
+        return True
     
     except Exception as e:
         print(f"Error embedding artwork into {file_path}: {e}")
         return False
+    
+    finally:
+        # The load is either saved (stale) or possibly half-modified
+        forget_audio_file(file_path)
 
 
-def download_and_embed_artwork(file_path: str, artwork_url: str, verbose: bool = True) -> bool:
+def embed_artwork_from_image_url(file_path: str, image_url: str, verbose: bool = True) -> bool:
     """
-    Fetch artwork from URL, download it, and embed it into the music file.
+    Download an artwork image and embed it into the music file.
     
     Args:
         file_path: Path to the music file
-        artwork_url: URL to the artwork selection page
+        image_url: URL of the artwork image itself
         verbose: If True, print progress information
     
     Returns:
         True if successful, False otherwise
     """
     if verbose:
-        print(f"  Fetching artwork page...")
-    
-    # Fetch the first available artwork image URL
-    image_url = fetch_first_artwork_image(artwork_url)
-    
-    if not image_url:
-        if verbose:
-            print(f"  ✗ Could not find artwork image on page")
-        return False
-    
-    if verbose:
-        print(f"  Found artwork image: {image_url}")
         print(f"  Downloading artwork...")
     
     # Download the image
@@ -208,14 +348,8 @@ def download_and_embed_artwork(file_path: str, artwork_url: str, verbose: bool =
     if verbose:
         print(f"  Downloaded {len(image_data)} bytes")
     
-    # Determine MIME type from URL or content
-    mime_type = 'image/jpeg'
-    if image_url.lower().endswith('.png'):
-        mime_type = 'image/png'
-    elif image_url.lower().endswith('.webp'):
-        mime_type = 'image/webp'
-    elif image_url.lower().endswith('.gif'):
-        mime_type = 'image/gif'
+    # Determine MIME type from the image bytes, falling back to the URL
+    mime_type = guess_image_mime_type(image_url, image_data)
     
     # Embed the artwork
     if verbose:
@@ -230,3 +364,37 @@ def download_and_embed_artwork(file_path: str, artwork_url: str, verbose: bool =
     
     return success
 
+
+def download_and_embed_artwork(file_path: str, artwork_url: str, verbose: bool = True, force: bool = False) -> bool:
+    """
+    Fetch artwork from URL, download it, and embed it into the music file.
+    
+    Args:
+        file_path: Path to the music file
+        artwork_url: URL to the artwork selection page
+        verbose: If True, print progress information
+        force: If True, embed even if the file already has artwork
+    
+    Returns:
+        True if successful or the file already has artwork, False otherwise
+    """
+    if not force and has_embedded_artwork(file_path):
+        if verbose:
+            print(f"  ✓ Artwork already embedded, skipping")
+        return True
+    
+    if verbose:
+        print(f"  Fetching artwork page...")
+    
+    # Fetch the first available artwork image URL
+    image_url = fetch_first_artwork_image(artwork_url)
+    
+    if not image_url:
+        if verbose:
+            print(f"  ✗ Could not find artwork image on page")
+        return False
+    
+    if verbose:
+        print(f"  Found artwork image: {image_url}")
+    
+    return embed_artwork_from_image_url(file_path, image_url, verbose)
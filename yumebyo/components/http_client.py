@@ -0,0 +1,150 @@
+"""
+Shared HTTP session for artwork page and image downloads.
+
+All downloads go through one `requests.Session` so that connections to the
+same host (artwork CDNs, YouTube thumbnail servers) are kept alive and reused
+instead of paying a new TCP/TLS handshake for every file.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+
+# Read size for streamed image bodies
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Largest image body accepted; real covers are a few MB at most
+MAX_COVER_BYTES = 20 * 1024 * 1024
+
+# yumebyo() runs up to 2 x max_workers requests at once (page lookups and
+# downloads), so keep enough idle connections per host that none are discarded.
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 64
+
+# Transient throttling and gateway errors are retried with a short backoff
+RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 502, 503, 504],
+    allowed_methods=frozenset({'GET', 'HEAD'})
+)
+
+# Upper bound on the bytes held by the in-memory image cache
+IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+_image_cache: "OrderedDict[Hashable, bytes]" = OrderedDict()
+_image_cache_bytes = 0
+_image_cache_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=RETRY_POLICY
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def close_session():
+    """Close the shared session, releasing its pooled connections and cached images."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+    clear_image_cache()
+
+
+def read_streamed_content(response: requests.Response, max_bytes: int = MAX_COVER_BYTES) -> bytes:
+    """
+    Read the body of a response opened with stream=True.
+
+    Callers can inspect the headers first and close the response without
+    downloading anything. A body with a plain Content-Length is read in one
+    go into a single buffer; otherwise it is pulled in DOWNLOAD_CHUNK_SIZE
+    chunks and appended to one growing buffer, so each chunk is freed as soon
+    as it is copied and the result is not assembled in a second copy.
+
+    Raises:
+        ValueError: If the body is, or announces itself as, larger than max_bytes.
+            The download stops as soon as the limit is passed.
+    """
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_bytes:
+            raise ValueError(f"Response too large ({content_length} bytes, limit {max_bytes})")
+        if not response.headers.get('Content-Encoding'):
+            # The size is known and bounded, so read straight from the socket into one
+            # buffer rather than collecting chunks and joining them into a second copy
+            return response.raw.read(decode_content=True)
+
+    buffer = io.BytesIO()
+    received = 0
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        received += len(chunk)
+        if received > max_bytes:
+            raise ValueError(f"Response too large (over {max_bytes} bytes)")
+        buffer.write(chunk)
+    # getvalue() hands over the buffer's own bytes object instead of copying it
+    return buffer.getvalue()
+
+
+def get_cached_image(key: Hashable) -> Optional[bytes]:
+    """
+    Return image bytes stored under key during this run, or None.
+
+    Tracks of one album usually point at the same cover URL, so downloaders
+    look here before going to the network. Keys are the image URL, or a
+    tuple of the URL and processing options for processed images.
+    """
+    with _image_cache_lock:
+        data = _image_cache.get(key)
+        if data is not None:
+            _image_cache.move_to_end(key)
+        return data
+
+
+def store_cached_image(key: Hashable, data: bytes):
+    """Store image bytes under key, evicting the least recently used entries past IMAGE_CACHE_MAX_BYTES."""
+    global _image_cache_bytes
+    if len(data) > IMAGE_CACHE_MAX_BYTES:
+        return
+    with _image_cache_lock:
+        previous = _image_cache.pop(key, None)
+        if previous is not None:
+            _image_cache_bytes -= len(previous)
+        _image_cache[key] = data
+        _image_cache_bytes += len(data)
+        while _image_cache_bytes > IMAGE_CACHE_MAX_BYTES:
+            _, evicted = _image_cache.popitem(last=False)
+            _image_cache_bytes -= len(evicted)
+
+
+def clear_image_cache():
+    """Drop all cached images."""
+    global _image_cache_bytes
+    with _image_cache_lock:
+        _image_cache.clear()
+        _image_cache_bytes = 0
@@ -2,17 +2,13 @@
 Artwork fetching, downloading, and embedding utilities.
 """
 
-import base64
 from typing import Optional
-import requests
+from ..http_client import get_session, read_streamed_content, get_cached_image, store_cached_image
+from ..downloadedCoverProcessor import embed_artwork, sniff_image_mime_type
+from ..youtube_music.get_thumbnail_url import sized_thumbnail_url
 
-from mutagen import File
-from mutagen.mp3 import MP3
-from mutagen.flac import FLAC
-from mutagen.mp4 import MP4
-from mutagen.oggvorbis import OggVorbis
 import io
-from ..localMusicScanner import MUTAGEN_AVAILABLE
+from ..localMusicScanner import has_embedded_artwork
 
 try:
     from PIL import Image  # type: ignore
@@ -27,7 +23,8 @@ def download_and_embed_artwork_using_url(
     mime_type: str = 'image/jpeg',
     square: bool = True,
     downscale_to_480: bool = False,
-    verbose: bool = True
+    verbose: bool = True,
+    force: bool = False
 ) -> bool:
     """
     Download an artwork image from a URL and embed it into a music file.
@@ -35,191 +32,132 @@ def download_and_embed_artwork_using_url(
     Args:
         file_path: Path to the music file
         image_url: URL of the artwork image to download
-        mime_type: MIME type of the image (default: 'image/jpeg')
+        mime_type: MIME type of the image (default: 'image/jpeg'); only used
+            when the type cannot be read from the image data itself
         square: If True, crop the image to a square
         downscale_to_480: If True, downscale the image to 480x480
+        force: If True, embed even if the file already has artwork
     
     Returns:
-        True if successful, False otherwise
+        True if successful or the file already has artwork, False otherwise
     """
+    if not force and has_embedded_artwork(file_path):
+        if verbose:
+            print(f"Artwork already embedded in {file_path}, skipping")
+        return True
 
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-    
-    try:
-        response = requests.get(image_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        # Check if it's actually an image
-        content_type = response.headers.get('Content-Type', '')
-
-        if 'image' in content_type.lower():
-            image_data = response.content
-            if square:
-                image_data = _crop_center_square(image_data)
-            if downscale_to_480:
-                image_data = _downscale_to_480(image_data)
-            
-            success = _embed_artwork(file_path, image_data, mime_type)
+    image_data = download_processed_artwork(image_url, square, downscale_to_480)
+    if image_data is None:
+        return False
 
-            if success and verbose:
-                print(f"Successfully embedded artwork into {file_path}")
-            else:
-                print(f"Failed to embed artwork into {file_path}")
+    # Unprocessed images keep their original format, which may not be JPEG
+    mime_type = sniff_image_mime_type(image_data) or mime_type
+    success = embed_artwork(file_path, image_data, mime_type)
 
-            return success
-        else:
-            print(f"Warning: URL does not appear to be an image (Content-Type: {content_type})")
-            return False
-    
-    except Exception as e:
-        print(f"Error downloading artwork image: {e}")
-        return False
-    
+    if success:
+        if verbose:
+            print(f"Successfully embedded artwork into {file_path}")
+    else:
+        print(f"Failed to embed artwork into {file_path}")
 
+    return success
 
-def _embed_artwork(
-    file_path: str, 
-    image_data: bytes, 
-    mime_type: str = 'image/jpeg'
-) -> bool:
+
+def download_processed_artwork(
+    image_url: str,
+    square: bool = True,
+    downscale_to_480: bool = False
+) -> Optional[bytes]:
     """
-    Embed artwork image into a music file.
+    Download an artwork image and crop and/or downscale it, ready for embedding.
+    
+    When downscaling, image CDN URLs that support it are rewritten to fetch a
+    480x480 rendition directly, so less is downloaded and decoded.
     
     Args:
-        file_path: Path to the music file
-        image_data: Image data as bytes
-        mime_type: MIME type of the image (default: 'image/jpeg')
+        image_url: URL of the artwork image to download
+        square: If True, crop the image to a square
+        downscale_to_480: If True, downscale the image to 480x480
     
     Returns:
-        True if embedding was successful, False otherwise
+        Image data as bytes, or None if the download fails
     """
-    if not MUTAGEN_AVAILABLE:
-        raise ImportError("mutagen is required. Install it with: pip install mutagen")
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    
+    # Tracks of one album often share a thumbnail URL; reuse the processed image
+    cache_key = (image_url, square, downscale_to_480)
+    image_data = get_cached_image(cache_key)
+    if image_data is not None:
+        return image_data
+    
+    download_url = sized_thumbnail_url(image_url, 480) if downscale_to_480 else image_url
     
     try:
-        
-        audio_file = File(file_path)
-        if audio_file is None:
-            raise ValueError(f"Unsupported file format or corrupted file: {file_path}")
-        
-        # Embed artwork based on file type
-        if isinstance(audio_file, MP3):
-            # MP3 uses APIC (Attached Picture) frames
-            from mutagen.id3 import ID3, APIC, error as ID3Error
-            
-            try:
-                audio_file.add_tags()
-            except ID3Error:
-                pass
-            
-            # Remove existing APIC frames
-            if audio_file.tags:
-                apic_keys = [key for key in audio_file.tags.keys() if key.startswith('APIC')]
-                for key in apic_keys:
-                    del audio_file.tags[key]
-            
-            # Add new APIC frame
-            audio_file.tags.add(APIC(
-                encoding=3,  # UTF-8
-                mime=mime_type,
-                type=3,  # Cover (front)
-                desc='Cover',
-                data=image_data
-            ))
-            audio_file.save()
-            return True
-        
-        elif isinstance(audio_file, FLAC):
-            # FLAC uses picture metadata
-            from mutagen.flac import Picture
-            
-            picture = Picture()
-            picture.type = 3  # Cover (front)
-            picture.mime = mime_type
-            picture.desc = 'Cover'
-            picture.data = image_data
+        with get_session().get(download_url, headers=headers, timeout=10, stream=True) as response:
+            response.raise_for_status()
             
-            audio_file.add_picture(picture)
-            audio_file.save()
-            return True
-        
-        elif isinstance(audio_file, MP4):
-            # MP4 uses 'covr' tag
-            from mutagen.mp4 import MP4Cover
-            
-            cover = MP4Cover(image_data, imageformat=MP4Cover.FORMAT_JPEG if 'jpeg' in mime_type or 'jpg' in mime_type else MP4Cover.FORMAT_PNG)
-            audio_file.tags['covr'] = [cover]
-            audio_file.save()
-            return True
-        
-        elif isinstance(audio_file, OggVorbis):
-            # OGG uses METADATA_BLOCK_PICTURE
-            from mutagen.flac import Picture
-            
-            picture = Picture()
-            picture.type = 3  # Cover (front)
-            picture.mime = mime_type
-            picture.desc = 'Cover'
-            picture.data = image_data
-            
-            data = picture.write()
-            b64data = base64.b64encode(data).decode('ascii')
-            audio_file['METADATA_BLOCK_PICTURE'] = [b64data]
-            audio_file.save()
-            return True
-        
-        else:
-            # Generic fallback - try to add as a tag
-            print(f"Warning: Unsupported file format for embedding artwork: {type(audio_file)}")
-            return False
-    
+            # Check if it's actually an image before reading the body
+            content_type = response.headers.get('Content-Type', '')
+            if 'image' not in content_type.lower():
+                print(f"Warning: URL does not appear to be an image (Content-Type: {content_type})")
+                return None
+
+            image_data = read_streamed_content(response)
+
+        image_data = _process_image(image_data, square, downscale_to_480)
+
     except Exception as e:
-        print(f"Error embedding artwork into {file_path}: {e}")
-        return False
+        print(f"Error downloading artwork image: {e}")
+        return None
 
+    store_cached_image(cache_key, image_data)
+    return image_data
 
-def _crop_center_square(image_data: bytes) -> bytes:
+
+def _process_image(image_data: bytes, square: bool, downscale_to_480: bool) -> bytes:
     """
-    Crop the image to a square.
+    Crop the image to a centred square and/or downscale it to 480x480.
+    
+    Both steps are applied to one decoded image and encoded once, instead of
+    a JPEG round-trip per step.
     
     Args:
         image_data: Image data as bytes
+        square: If True, crop the image to a square
+        downscale_to_480: If True, downscale the image to 480x480
     
     Returns:
-        Image data as bytes
+        Image data as bytes; the input is returned unchanged when no step applies
     """
-    image = Image.open(io.BytesIO(image_data)).convert("RGB")
-    
-    width, height = image.size
-    if width == height:
+    if not square and not downscale_to_480:
         return image_data
-    side = min(width, height)
-    left = (width - side) // 2
-    top = (height - side) // 2
-    right = left + side
-    bottom = top + side
-    cropped = image.crop((left, top, right, bottom))
 
-    buffer = io.BytesIO()
-    cropped.save(buffer, format="JPEG", quality=95)
-    return buffer.getvalue()
+    image = Image.open(io.BytesIO(image_data))
+    width, height = image.size
+    needs_crop = square and width != height
+    # A 480x480 JPEG is already what the downscale step would produce
+    needs_resize = downscale_to_480 and not ((width, height) == (480, 480) and image.format == "JPEG")
 
+    if not needs_crop and not needs_resize:
+        return image_data
 
-def _downscale_to_480(image_data: bytes) -> bytes:
-    """
-    Downscale the image to 480x480.
-    
-    Args:
-        image_data: Image data as bytes
-    
-    Returns:
-        Image data as bytes
-    """
+    if needs_resize:
+        # Let libjpeg scale by 1/2, 1/4 or 1/8 during decode while staying at
+        # least 2x the target, so LANCZOS still has detail to work with
+        image.draft("RGB", (960, 960))
+        width, height = image.size
+
+    image = image.convert("RGB")
 
-    image = Image.open(io.BytesIO(image_data)).convert("RGB")
-    image = image.resize((480, 480), Image.LANCZOS)
+    if needs_crop:
+        side = min(width, height)
+        left = (width - side) // 2
+        top = (height - side) // 2
+        image = image.crop((left, top, left + side, top + side))
 
+    if needs_resize:
+        image = image.resize((480, 480), Image.LANCZOS)
 
     buffer = io.BytesIO()
     image.save(buffer, format="JPEG", quality=95)
-    return buffer.getvalue()
\ No newline at end of file
+    return buffer.getvalue()
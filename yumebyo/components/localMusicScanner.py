@@ -1,8 +1,13 @@
-from pathlib import Path
-from typing import List, Dict, Optional, Iterable, Tuple
+from typing import AbstractSet, List, Dict, Optional, Iterable, Iterator, Sequence, Tuple, Union
 import os
 import base64
 import io
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .scan_cache import get_cached_scan, store_scans
 
 # Check if mutagen is installed
 try:
@@ -11,25 +16,66 @@ try:
     from mutagen.flac import FLAC, Picture
     from mutagen.mp4 import MP4
     from mutagen.oggvorbis import OggVorbis
+    from mutagen.oggopus import OggOpus
+    from mutagen.wave import WAVE
+    from mutagen.aac import AAC
     MUTAGEN_AVAILABLE = True
 except ImportError:
     MUTAGEN_AVAILABLE = False
     print("Warning: mutagen not installed. Install it with: pip install mutagen")
 
+# PIL is only needed to size covers that are neither JPEG nor PNG, so it is
+# imported on first use by _is_square_image(); scans (and scan_library()'s
+# worker processes) that never meet such a cover do not load it.
 
-try:
-    from PIL import Image  # type: ignore
+# A tuple so the whole match is one str.endswith() call in C
+_MUSIC_EXTS = ('.mp3', '.flac', '.m4a', '.mp4', '.ogg', '.oga', '.opus', '.wav', '.aac')
 
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+# Folders that never hold a music library; hidden folders (".git", ".Trashes", ...) are skipped too
+_SKIP_DIRS = frozenset({'node_modules', '__pycache__', 'System Volume Information', '$RECYCLE.BIN'})
+
+
+def _scandir_recursive(
+    path: str,
+    recursive: bool = True,
+    skip_dirs: AbstractSet[str] = _SKIP_DIRS,
+    extensions: Optional[Tuple[str, ...]] = None
+) -> Iterator[os.DirEntry]:
+    """
+    Yield the file entries below a directory using os.scandir.
+
+    DirEntry objects carry the file type reported by the directory listing, so
+    no extra stat() call is needed per entry. Symlinks are not followed and
+    unreadable directories are skipped, as are hidden directories and those
+    named in skip_dirs. If extensions (lowercase) is given, only files ending
+    in one of them are yielded; other names are dropped before their type is checked.
 
+    Directories are walked from an explicit stack rather than by recursion, so
+    deep trees neither hit the recursion limit nor pass every entry up a chain
+    of nested generators.
+    """
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        name = entry.name
+                        if recursive and not name.startswith('.') and name not in skip_dirs:
+                            stack.append(entry.path)
+                    elif (extensions is None or entry.name.lower().endswith(extensions)) \
+                            and entry.is_file(follow_symlinks=False):
+                        yield entry
+        except PermissionError:
+            pass
 
 
 def get_local_music_file_paths(
     folder_path: str,
     recursive: bool = True,
-    verbose: bool = True
+    verbose: bool = True,
+    sort: bool = True,
+    skip_dirs: Optional[AbstractSet[str]] = None
 ) -> List[str]:
     """
     Get the paths of all music files in a folder.
@@ -37,28 +83,60 @@ def get_local_music_file_paths(
     Args:
         folder_path: Path to the folder to scan
         recursive: If True, scan subdirectories recursively
+        sort: If True, return the paths sorted; otherwise they are in the
+            order the filesystem lists them
+        skip_dirs: Folder names not to descend into; defaults to common
+            system folders. Hidden folders are always skipped.
     
     Returns:
         List of paths to music files in the folder
     """
-    music_extensions = {'.mp3', '.flac', '.m4a', '.mp4', '.ogg', '.oga', '.opus', '.wav', '.aac'}
-    music_files = []
+    folder_path = os.fspath(folder_path)
+    if not os.path.isdir(folder_path):
+        return []
     
-    folder = Path(folder_path)
-    if not folder.exists() or not folder.is_dir():
-        return music_files
+    if skip_dirs is None:
+        skip_dirs = _SKIP_DIRS
     
-    if recursive:
-        for file_path in folder.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in music_extensions:
-                music_files.append(str(file_path))
-    else:
-        for file_path in folder.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in music_extensions:
-                music_files.append(str(file_path))
+    music_files = [
+        entry.path for entry in _scandir_recursive(folder_path, recursive, skip_dirs, _MUSIC_EXTS)
+    ]
     
-    return sorted(music_files)
+    if sort:
+        music_files.sort()
+    return music_files
+
+
+
+_ARTWORK_KEY_PREFIXES = ('APIC', 'covr')
+
 
+def _is_artwork_key(key) -> bool:
+    """Return True if a tag key of an otherwise unhandled format holds artwork."""
+    key_str = str(key)
+    return key_str.startswith(_ARTWORK_KEY_PREFIXES) or "PICTURE" in key_str.upper()
+
+
+def _parse_picture_block(block: bytes) -> Optional[Tuple[bytes, int, int]]:
+    """
+    Read (image_data, width, height) straight from a FLAC picture block.
+
+    Skips building a mutagen Picture, which decodes the MIME type and
+    description only for them to be discarded. Returns None if the block is
+    malformed.
+    """
+    try:
+        mime_length = struct.unpack_from('>I', block, 4)[0]
+        offset = 8 + mime_length
+        description_length = struct.unpack_from('>I', block, offset)[0]
+        offset += 4 + description_length
+        width, height, _depth, _colors, data_length = struct.unpack_from('>5I', block, offset)
+    except struct.error:
+        return None
+    offset += 20
+    if offset + data_length > len(block):
+        return None
+    return block[offset:offset + data_length], width, height
 
 
 def _iter_embedded_artwork(
@@ -69,12 +147,10 @@ def _iter_embedded_artwork(
     if isinstance(audio_file, MP3):
         tags = getattr(audio_file, "tags", None)
         if tags:
-            for frame in list(tags.values()):
-                frame_id = getattr(frame, "FrameID", "")
-                if isinstance(frame_id, str) and frame_id.startswith("APIC"):
-                    data = getattr(frame, "data", None)
-                    if data:
-                        yield data, None, None
+            for frame in tags.getall("APIC"):
+                data = frame.data
+                if data:
+                    yield data, None, None
 
     elif isinstance(audio_file, FLAC):
         for picture in getattr(audio_file, "pictures", []) or []:
@@ -107,23 +183,68 @@ def _iter_embedded_artwork(
                 for entry in entries:
                     try:
                         picture_bytes = base64.b64decode(entry)
-                        picture = Picture(picture_bytes)
-                        data = picture.data
-                        width = getattr(picture, "width", None)
-                        height = getattr(picture, "height", None)
                     except Exception:
                         continue
-                    if data:
-                        yield data, width, height
+                    parsed = _parse_picture_block(picture_bytes)
+                    if parsed is None:
+                        try:
+                            picture = Picture(picture_bytes)
+                        except Exception:
+                            continue
+                        parsed = picture.data, getattr(picture, "width", None), getattr(picture, "height", None)
+                    if parsed[0]:
+                        yield parsed
 
     else:
         tags = getattr(audio_file, "tags", None)
         if tags:
             for key, value in list(tags.items()):
-                key_str = str(key)
-                if "PICTURE" in key_str.upper() or key_str.startswith("APIC"):
-                    if isinstance(value, bytes):
-                        yield value, None, None
+                if isinstance(value, bytes) and _is_artwork_key(key):
+                    yield value, None, None
+
+
+# JPEG start-of-frame markers; 0xC4 (DHT), 0xC8 (JPG) and 0xCC (DAC) share the range but are not frames
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _jpeg_dimensions(image_data: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from a JPEG's start-of-frame segment without decoding it."""
+    offset = 2
+    end = len(image_data)
+    while offset + 9 <= end:
+        if image_data[offset] != 0xFF:
+            return None
+        marker = image_data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before the actual marker
+            offset += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            # The loop condition guarantees the 9 bytes up to width are present
+            height, width = struct.unpack('>HH', image_data[offset + 5:offset + 9])
+            return (width, height) if width and height else None
+        if marker == 0xDA:
+            # Start of scan: entropy-coded data follows, no frame header seen
+            return None
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Standalone markers carry no length
+            offset += 2
+            continue
+        segment_length = struct.unpack('>H', image_data[offset + 2:offset + 4])[0]
+        if segment_length < 2:
+            return None  # The length counts its own two bytes
+        offset += 2 + segment_length
+    return None
+
+
+def _image_dimensions(image_data: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from JPEG or PNG headers, or None for other or malformed data."""
+    if image_data[:3] == b'\xff\xd8\xff':
+        return _jpeg_dimensions(image_data)
+    if image_data[:8] == _PNG_SIGNATURE and image_data[12:16] == b'IHDR' and len(image_data) >= 24:
+        return struct.unpack('>II', image_data[16:24])
+    return None
 
 
 def _is_square_image(image_data: bytes, width: Optional[int], height: Optional[int]) -> Optional[bool]:
@@ -135,17 +256,34 @@ def _is_square_image(image_data: bytes, width: Optional[int], height: Optional[i
     if not image_data:
         return None
 
-    if not PIL_AVAILABLE:
+    # Covers are nearly always JPEG or PNG, whose headers give the size directly
+    dimensions = _image_dimensions(image_data)
+    if dimensions is not None:
+        return dimensions[0] == dimensions[1]
+
+    try:
+        from PIL import Image  # type: ignore
+    except ImportError:
         return None
 
     try:
+        # Image.open only parses the header; the size is known without decoding pixels
         with Image.open(io.BytesIO(image_data)) as img:
-            img.load()
             return img.width == img.height
     except Exception:
         return None
 
 
+def _keep_freed_padding(info) -> int:
+    """
+    mutagen padding callback that keeps the space freed by removed pictures.
+
+    The file is then rewritten in place rather than shrunk, and the cover
+    embedded next usually fits into that padding without another full rewrite.
+    """
+    return max(info.padding, info.get_default_padding())
+
+
 def remove_embedded_artwork(file_path: str, audio_file: Optional["File"] = None) -> bool:
     """Remove all embedded artwork from the file."""
 
@@ -155,38 +293,33 @@ def remove_embedded_artwork(file_path: str, audio_file: Optional["File"] = None)
     if not os.path.exists(file_path):
         return False
 
-    close_file = False
-    if audio_file is None:
-        audio_file = File(file_path)
-        close_file = True
-
-    if audio_file is None:
-        return False
-
     removed = False
 
     try:
+        if audio_file is None:
+            audio_file = open_audio_file(file_path)
+
+        if audio_file is None:
+            return False
+
         if isinstance(audio_file, MP3):
             tags = getattr(audio_file, "tags", None)
-            if tags:
-                keys_to_delete = [key for key in tags.keys() if str(key).startswith("APIC")]
-                for key in keys_to_delete:
-                    del tags[key]
-                    removed = True
-                if removed:
-                    audio_file.save()
+            if tags and tags.getall("APIC"):
+                tags.delall("APIC")
+                removed = True
+                audio_file.save(padding=_keep_freed_padding)
 
         elif isinstance(audio_file, FLAC):
             if getattr(audio_file, "pictures", None):
                 audio_file.clear_pictures()
-                audio_file.save()
+                audio_file.save(padding=_keep_freed_padding)
                 removed = True
 
         elif isinstance(audio_file, MP4):
             tags = getattr(audio_file, "tags", None)
             if tags and "covr" in tags:
                 tags.pop("covr", None)
-                audio_file.save()
+                audio_file.save(padding=_keep_freed_padding)
                 removed = True
 
         elif isinstance(audio_file, OggVorbis):
@@ -198,13 +331,13 @@ def remove_embedded_artwork(file_path: str, audio_file: Optional["File"] = None)
                         del tags[key]
                         deleted = True
                 if deleted:
-                    audio_file.save()
+                    audio_file.save(padding=_keep_freed_padding)
                     removed = True
 
         else:
             tags = getattr(audio_file, "tags", None)
             if tags:
-                keys_to_delete = [key for key in tags.keys() if "PICTURE" in str(key).upper()]
+                keys_to_delete = [key for key in tags.keys() if _is_artwork_key(key)]
                 for key in keys_to_delete:
                     del tags[key]
                     removed = True
@@ -213,55 +346,373 @@ def remove_embedded_artwork(file_path: str, audio_file: Optional["File"] = None)
 
     except Exception as exc:
         print(f"Warning: failed to remove artwork from {file_path}: {exc}")
+        forget_audio_file(file_path)
         return False
-    finally:
-        if close_file and hasattr(audio_file, "close"):
-            try:
-                audio_file.close()  # type: ignore[attr-defined]
-            except Exception:
-                pass
+
+    if removed:
+        # The saved object matches the file again; keep it for the embed step
+        try:
+            _remember_audio_file(file_path, audio_file)
+        except OSError:
+            pass
 
     return removed
 
 
-def has_embedded_artwork(file_path: str) -> bool:
+def remove_embedded_artwork_batch(file_paths: Sequence[str], max_workers: Optional[int] = None) -> Dict[str, bool]:
     """
-    Check if a music file has embedded artwork/cover art using mutagen.
+    Remove all embedded artwork from many files on a thread pool, so the file
+    reads and writes of different files overlap.
+    
+    A file that is missing, unreadable or fails to save maps to False; the
+    other files are still processed and reported.
     
     Args:
-        file_path: Path to the music file
+        file_paths: Paths of the music files to clean
+        max_workers: Number of threads; defaults to min(8, CPU count)
     
     Returns:
-        True if artwork is embedded, False otherwise
+        Dictionary mapping each path to whether artwork was removed from it
     """
-
-    if not MUTAGEN_AVAILABLE:
-        return False
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
     
-    if not os.path.exists(file_path):
-        return False
-    
-    try:
-        audio_file = File(file_path)
-        if audio_file is None:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(file_paths, executor.map(remove_embedded_artwork, file_paths)))
+
+
+_ID3_FRAME_ID_CHARS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+# Parsers for every extension the scanner picks up, so mutagen.File does not
+# have to score every format against the file header first
+_PARSERS = {
+    '.mp3': MP3,
+    '.flac': FLAC,
+    '.m4a': MP4,
+    '.mp4': MP4,
+    '.ogg': OggVorbis,
+    '.oga': OggVorbis,
+    '.opus': OggOpus,
+    '.wav': WAVE,
+    '.aac': AAC,
+} if MUTAGEN_AVAILABLE else {}
+
+# Loaded files kept for reuse, keyed by path and validated against st_mtime_ns
+_AUDIO_CACHE_SIZE = 1024
+_audio_cache: "OrderedDict[str, Tuple[int, File]]" = OrderedDict()
+_audio_cache_lock = threading.Lock()
+
+
+def open_audio_file(file_path: str) -> Optional["File"]:
+    """
+    Load a file with mutagen.File, reusing an earlier load if the file is unchanged.
+
+    The probe, the artwork removal and the embed step all need the parsed
+    file; sharing one load avoids parsing the same tags two or three times.
+    Callers that modify and save the file must call forget_audio_file()
+    afterwards.
+    """
+    mtime_ns = os.stat(file_path).st_mtime_ns
+    with _audio_cache_lock:
+        cached = _audio_cache.get(file_path)
+        if cached is not None and cached[0] == mtime_ns:
+            _audio_cache.move_to_end(file_path)
+            return cached[1]
+
+    audio_file = _load_audio_file(file_path)
+    if audio_file is not None:
+        _remember_audio_file(file_path, audio_file, mtime_ns)
+    return audio_file
+
+
+def _load_audio_file(file_path: str) -> Optional["File"]:
+    """Load a file with the parser for its extension, falling back to mutagen.File."""
+    dot = file_path.rfind('.')
+    parser = _PARSERS.get(file_path[dot:].lower() if dot >= 0 else '')
+    if parser is not None:
+        try:
+            return parser(file_path)
+        except Exception:
+            # Misnamed file (e.g. Opus in .ogg); let mutagen work out the format
+            pass
+    return File(file_path)
+
+
+def _remember_audio_file(file_path: str, audio_file: "File", mtime_ns: Optional[int] = None):
+    """Cache a loaded file against its current (or the given) modification time."""
+    if mtime_ns is None:
+        mtime_ns = os.stat(file_path).st_mtime_ns
+    with _audio_cache_lock:
+        _audio_cache[file_path] = (mtime_ns, audio_file)
+        _audio_cache.move_to_end(file_path)
+        while len(_audio_cache) > _AUDIO_CACHE_SIZE:
+            _audio_cache.popitem(last=False)
+
+
+def forget_audio_file(file_path: str):
+    """Drop the cached load of a file, e.g. after it has been saved."""
+    with _audio_cache_lock:
+        _audio_cache.pop(file_path, None)
+
+
+def _syncsafe_int(data: bytes) -> int:
+    """Decode an ID3v2 syncsafe integer (7 significant bits per byte)."""
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _id3_has_picture_frame(handle) -> Optional[bool]:
+    """Walk the ID3v2.3/2.4 frame headers at the start of the file looking for APIC."""
+
+    header = handle.read(10)
+    if len(header) < 10 or header[:3] != b'ID3':
+        return None
+
+    version, flags = header[3], header[5]
+    # Unsynchronised v2.3 tags and extended headers are left to mutagen
+    if version not in (3, 4) or flags & 0x40 or (version == 3 and flags & 0x80):
+        return None
+
+    tag_size = _syncsafe_int(header[6:10])
+    position = 0
+    # Some writers store plain (non-syncsafe) v2.4 frame sizes. Both readings
+    # agree below 0x80, but after skipping a larger frame the walk may have
+    # landed anywhere, even past an APIC frame into padding.
+    size_ambiguous = False
+    while position + 10 <= tag_size:
+        frame_header = handle.read(10)
+        if len(frame_header) < 10:
+            return None
+        frame_id = frame_header[:4]
+        if frame_id == b'\x00\x00\x00\x00':
+            # Padding runs to the end of the tag; anything else means the walk went astray
+            if size_ambiguous:
+                return None
+            padding = frame_header + handle.read(tag_size - position - 10)
+            return False if not padding.strip(b'\x00') else None
+        if frame_id == b'APIC':
+            return True
+        if frame_id.strip(_ID3_FRAME_ID_CHARS):
+            return None  # Not a frame header, e.g. a non-syncsafe v2.4 size was misread
+        if version == 4:
+            if any(byte & 0x80 for byte in frame_header[4:8]):
+                return None  # Not syncsafe at all
+            frame_size = _syncsafe_int(frame_header[4:8])
+            size_ambiguous = size_ambiguous or frame_size >= 0x80
+        else:
+            frame_size = int.from_bytes(frame_header[4:8], 'big')
+        position += 10 + frame_size
+        if position > tag_size:
+            return None
+        handle.seek(frame_size, os.SEEK_CUR)
+    return None if size_ambiguous else False
+
+
+def _flac_has_picture_block(handle) -> Optional[bool]:
+    """Walk the FLAC metadata block headers looking for a PICTURE (type 6) block."""
+
+    if handle.read(4) != b'fLaC':
+        return None
+
+    while True:
+        block_header = handle.read(4)
+        if len(block_header) < 4:
+            return None
+        if block_header[0] & 0x7F == 6:
+            return True
+        if block_header[0] & 0x80:
+            return False  # Last metadata block
+        handle.seek(int.from_bytes(block_header[1:4], 'big'), os.SEEK_CUR)
+
+
+# Returned by _find_mp4_box() when the boxes cannot be walked reliably
+_MP4_MALFORMED = (-1, -1)
+
+
+def _find_mp4_box(handle, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Find a child box between the current position and end.
+
+    Returns:
+        Tuple of (payload_start, box_end), None if the children end without
+        such a box, or _MP4_MALFORMED if a box header is truncated or its
+        size does not fit the parent
+    """
+    position = handle.tell()
+    while position + 8 <= end:
+        handle.seek(position)
+        box_header = handle.read(8)
+        if len(box_header) < 8:
+            return _MP4_MALFORMED
+        size, current_type = struct.unpack('>I4s', box_header)
+        payload_start = position + 8
+        if size == 1:
+            large_size = handle.read(8)
+            if len(large_size) < 8:
+                return _MP4_MALFORMED
+            size = struct.unpack('>Q', large_size)[0]
+            payload_start += 8
+        elif size == 0:
+            size = end - position
+        if size < payload_start - position:
+            return _MP4_MALFORMED
+        if current_type == box_type:
+            return payload_start, position + size
+        position += size
+    # The children must exactly fill the parent
+    return None if position == end else _MP4_MALFORMED
+
+
+def _mp4_has_cover_atom(handle) -> Optional[bool]:
+    """Look for moov/udta/meta/ilst/covr without reading the media data."""
+
+    end = handle.seek(0, os.SEEK_END)
+    handle.seek(0)
+    for box_type in (b'moov', b'udta', b'meta', b'ilst', b'covr'):
+        box = _find_mp4_box(handle, end, box_type)
+        if box is _MP4_MALFORMED:
+            return None
+        if box is None:
             return False
-        
+        payload_start, end = box
+        # meta is a full box: skip its version and flags
+        handle.seek(payload_start + 4 if box_type == b'meta' else payload_start)
+    return True
+
+
+def _ogg_comment_packet_spans(handle) -> Optional[List[Tuple[int, int]]]:
+    """
+    Locate the second packet of an Ogg stream (the comment header) from page headers alone.
+
+    Returns:
+        List of (file_offset, length) spans holding the packet, or None if the
+        pages do not look like a plain single-stream Ogg file
+    """
+    spans: List[Tuple[int, int]] = []
+    first_page = True
+    while True:
+        header = handle.read(27)
+        if len(header) < 27 or header[:4] != b'OggS':
+            return None
+        lacing = handle.read(header[26])
+        if len(lacing) < header[26]:
+            return None
+        position = handle.tell()
+
+        if first_page:
+            # The identification header sits alone on the first page
+            first_page = False
+            handle.seek(sum(lacing), os.SEEK_CUR)
+            continue
+
+        for segment_size in lacing:
+            if segment_size:
+                if spans and spans[-1][0] + spans[-1][1] == position:
+                    spans[-1] = (spans[-1][0], spans[-1][1] + segment_size)
+                else:
+                    spans.append((position, segment_size))
+            position += segment_size
+            if segment_size < 255:
+                return spans
+        handle.seek(position)
+
+
+def _read_spans(handle, spans: List[Tuple[int, int]], offset: int, size: int) -> bytes:
+    """Read size bytes starting at offset within the data described by spans."""
+    parts = []
+    for span_start, span_length in spans:
+        if offset >= span_length:
+            offset -= span_length
+            continue
+        handle.seek(span_start + offset)
+        part = handle.read(min(size, span_length - offset))
+        parts.append(part)
+        size -= len(part)
+        offset = 0
+        if size <= 0:
+            break
+    return b''.join(parts)
+
+
+_VORBIS_PICTURE_KEY = b'METADATA_BLOCK_PICTURE='
+
+
+def _vorbis_has_picture_comment(handle) -> Optional[bool]:
+    """Walk the Vorbis comment keys looking for METADATA_BLOCK_PICTURE, skipping the values."""
+
+    spans = _ogg_comment_packet_spans(handle)
+    if spans is None or _read_spans(handle, spans, 0, 7) != b'\x03vorbis':
+        return None
+
+    total = sum(span_length for _, span_length in spans)
+    position = 7
+    vendor_length = struct.unpack('<I', _read_spans(handle, spans, position, 4))[0]
+    position += 4 + vendor_length
+    count = struct.unpack('<I', _read_spans(handle, spans, position, 4))[0]
+    position += 4
+    for _ in range(count):
+        length = struct.unpack('<I', _read_spans(handle, spans, position, 4))[0]
+        key = _read_spans(handle, spans, position + 4, min(length, len(_VORBIS_PICTURE_KEY)))
+        if key.upper() == _VORBIS_PICTURE_KEY:
+            return True
+        position += 4 + length
+        if position > total:
+            return None
+    return False
+
+
+_QUICK_ARTWORK_CHECKS = {
+    '.mp3': _id3_has_picture_frame,
+    '.flac': _flac_has_picture_block,
+    '.m4a': _mp4_has_cover_atom,
+    '.mp4': _mp4_has_cover_atom,
+    '.ogg': _vorbis_has_picture_comment,
+    '.oga': _vorbis_has_picture_comment,
+}
+
+
+def _quick_artwork_check(file_path: str) -> Optional[bool]:
+    """
+    Check for embedded artwork by reading only container/tag headers.
+
+    Returns:
+        False if the file definitely has no artwork, True if a picture is
+        present (its shape is not checked), or None if the header scan was
+        inconclusive and mutagen has to decide
+    """
+    dot = file_path.rfind('.')
+    check = _QUICK_ARTWORK_CHECKS.get(file_path[dot:].lower() if dot >= 0 else '')
+    if check is None:
+        return None
+
+    try:
+        with open(file_path, 'rb') as handle:
+            return check(handle)
+    except (OSError, struct.error):
+        return None
+
+
+def _check_embedded_artwork(file_path: str, audio_file: "File") -> bool:
+    """
+    Return True if the already-loaded audio file has usable embedded artwork.
+
+    Non-square artwork is removed from the file and reported as missing. The
+    scan stops at the first square cover; later pictures are not inspected.
+    """
+
+    try:
         artwork_found = False
-        square_artwork_found = False
 
         for artwork_data, width, height in _iter_embedded_artwork(audio_file):
-            artwork_found = True
             is_square = _is_square_image(artwork_data, width, height)
 
+            if is_square is True:
+                return True
+
             if is_square is False:
                 remove_embedded_artwork(file_path, audio_file)
                 return False
 
-            if is_square is True:
-                square_artwork_found = True
-
-        if square_artwork_found:
-            return True
+            artwork_found = True
 
         return artwork_found
     
@@ -269,6 +720,42 @@ def has_embedded_artwork(file_path: str) -> bool:
         return False
 
 
+def has_embedded_artwork(file_path: str, audio_file: Optional["File"] = None) -> bool:
+    """
+    Check if a music file has embedded artwork/cover art using mutagen.
+    
+    Args:
+        file_path: Path to the music file
+        audio_file: The file already loaded with mutagen, if the caller has it
+    
+    Returns:
+        True if artwork is embedded, False otherwise
+    """
+
+    if not MUTAGEN_AVAILABLE:
+        return False
+    
+    if audio_file is None:
+        if not os.path.exists(file_path):
+            return False
+        
+        # A header scan settles files without artwork; pictures still need the
+        # full load to check (and fix) their shape
+        if _quick_artwork_check(file_path) is False:
+            return False
+    
+    try:
+        if audio_file is None:
+            audio_file = open_audio_file(file_path)
+        if audio_file is None:
+            return False
+        
+        return _check_embedded_artwork(file_path, audio_file)
+    
+    except Exception:
+        return False
+
+
 
 def _extract_tag_value(tag_value):
     """
@@ -289,7 +776,100 @@ def _extract_tag_value(tag_value):
     return str(tag_value)
 
 
-def get_music_metadata(file_path: str) -> Dict[str, Optional[str]]:
+def _read_tag_metadata(audio_file: "File") -> Dict[str, Optional[str]]:
+    """Extract artist, album and title from an already-loaded audio file."""
+
+    metadata = {
+        'artist': None,
+        'album': None,
+        'title': None
+    }
+
+    # Extract metadata based on file type
+    if isinstance(audio_file, MP3):
+        # MP3 files use ID3 tags
+        if audio_file.tags is not None:
+            # Try common tag names
+            artist_tags = ['TPE1', 'TPE2', 'TCOM']
+            album_tags = ['TALB']
+            title_tags = ['TIT2', 'TIT1']
+
+            for tag in artist_tags:
+                if tag in audio_file.tags:
+                    metadata['artist'] = _extract_tag_value(audio_file.tags[tag])
+                    if metadata['artist']:
+                        break
+
+            for tag in album_tags:
+                if tag in audio_file.tags:
+                    metadata['album'] = _extract_tag_value(audio_file.tags[tag])
+                    if metadata['album']:
+                        break
+
+            for tag in title_tags:
+                if tag in audio_file.tags:
+                    metadata['title'] = _extract_tag_value(audio_file.tags[tag])
+                    if metadata['title']:
+                        break
+
+    elif isinstance(audio_file, FLAC):
+        # FLAC files use Vorbis comments
+        if audio_file.tags is not None:
+            if 'artist' in audio_file.tags:
+                metadata['artist'] = _extract_tag_value(audio_file.tags['artist'])
+            if 'album' in audio_file.tags:
+                metadata['album'] = _extract_tag_value(audio_file.tags['album'])
+            if 'title' in audio_file.tags:
+                metadata['title'] = _extract_tag_value(audio_file.tags['title'])
+
+    elif isinstance(audio_file, MP4):
+        # MP4/M4A files use iTunes tags
+        if audio_file.tags is not None:
+            # MP4 uses different tag names
+            if '\xa9ART' in audio_file.tags:
+                metadata['artist'] = _extract_tag_value(audio_file.tags['\xa9ART'])
+            if '\xa9alb' in audio_file.tags:
+                metadata['album'] = _extract_tag_value(audio_file.tags['\xa9alb'])
+            if '\xa9nam' in audio_file.tags:
+                metadata['title'] = _extract_tag_value(audio_file.tags['\xa9nam'])
+
+    elif isinstance(audio_file, OggVorbis):
+        # OGG files use Vorbis comments
+        if audio_file.tags is not None:
+            if 'artist' in audio_file.tags:
+                metadata['artist'] = _extract_tag_value(audio_file.tags['artist'])
+            if 'album' in audio_file.tags:
+                metadata['album'] = _extract_tag_value(audio_file.tags['album'])
+            if 'title' in audio_file.tags:
+                metadata['title'] = _extract_tag_value(audio_file.tags['title'])
+
+    else:
+        # Generic fallback - try common tag names
+        if hasattr(audio_file, 'tags') and audio_file.tags is not None:
+            tags = audio_file.tags
+            # Try various common tag formats
+            for artist_key in ['artist', 'ARTIST', 'TPE1', '\xa9ART']:
+                if artist_key in tags:
+                    metadata['artist'] = _extract_tag_value(tags[artist_key])
+                    if metadata['artist']:
+                        break
+
+            for album_key in ['album', 'ALBUM', 'TALB', '\xa9alb']:
+                if album_key in tags:
+                    metadata['album'] = _extract_tag_value(tags[album_key])
+                    if metadata['album']:
+                        break
+
+            for title_key in ['title', 'TITLE', 'TIT2', '\xa9nam']:
+                if title_key in tags:
+                    metadata['title'] = _extract_tag_value(tags[title_key])
+                    if metadata['title']:
+                        break
+
+    return metadata
+
+
+def get_music_metadata(file_path: str, audio_file: Optional["File"] = None) -> Dict[str, Optional[str]]:
     """
     Extract artist and album/title from a music file.
     
@@ -301,6 +881,7 @@ def get_music_metadata(file_path: str) -> Dict[str, Optional[str]]:
     
     Args:
         file_path: Path to the music file
+        audio_file: The file already loaded with mutagen, if the caller has it
     
     Returns:
         Dictionary with 'artist' and 'album'/'title' keys
@@ -308,103 +889,202 @@ def get_music_metadata(file_path: str) -> Dict[str, Optional[str]]:
     if not MUTAGEN_AVAILABLE:
         raise ImportError("mutagen is required. Install it with: pip install mutagen")
     
-    if not os.path.exists(file_path):
+    if audio_file is None and not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
     try:
-        audio_file = File(file_path)
+        if audio_file is None:
+            audio_file = open_audio_file(file_path)
         if audio_file is None:
             raise ValueError(f"Unsupported file format or corrupted file: {file_path}")
         
-        metadata = {
-            'artist': None,
-            'album': None,
-            'title': None
-        }
-        
-        # Extract metadata based on file type
-        if isinstance(audio_file, MP3):
-            # MP3 files use ID3 tags
-            if audio_file.tags is not None:
-                # Try common tag names
-                artist_tags = ['TPE1', 'TPE2', 'TCOM']
-                album_tags = ['TALB']
-                title_tags = ['TIT2', 'TIT1']
-                
-                for tag in artist_tags:
-                    if tag in audio_file.tags:
-                        metadata['artist'] = _extract_tag_value(audio_file.tags[tag])
-                        if metadata['artist']:
-                            break
-                
-                for tag in album_tags:
-                    if tag in audio_file.tags:
-                        metadata['album'] = _extract_tag_value(audio_file.tags[tag])
-                        if metadata['album']:
-                            break
-                
-                for tag in title_tags:
-                    if tag in audio_file.tags:
-                        metadata['title'] = _extract_tag_value(audio_file.tags[tag])
-                        if metadata['title']:
-                            break
-        
-        elif isinstance(audio_file, FLAC):
-            # FLAC files use Vorbis comments
-            if audio_file.tags is not None:
-                if 'artist' in audio_file.tags:
-                    metadata['artist'] = _extract_tag_value(audio_file.tags['artist'])
-                if 'album' in audio_file.tags:
-                    metadata['album'] = _extract_tag_value(audio_file.tags['album'])
-                if 'title' in audio_file.tags:
-                    metadata['title'] = _extract_tag_value(audio_file.tags['title'])
-        
-        elif isinstance(audio_file, MP4):
-            # MP4/M4A files use iTunes tags
-            if audio_file.tags is not None:
-                # MP4 uses different tag names
-                if '\xa9ART' in audio_file.tags:
-                    metadata['artist'] = _extract_tag_value(audio_file.tags['\xa9ART'])
-                if '\xa9alb' in audio_file.tags:
-                    metadata['album'] = _extract_tag_value(audio_file.tags['\xa9alb'])
-                if '\xa9nam' in audio_file.tags:
-                    metadata['title'] = _extract_tag_value(audio_file.tags['\xa9nam'])
-        
-        elif isinstance(audio_file, OggVorbis):
-            # OGG files use Vorbis comments
-            if audio_file.tags is not None:
-                if 'artist' in audio_file.tags:
-                    metadata['artist'] = _extract_tag_value(audio_file.tags['artist'])
-                if 'album' in audio_file.tags:
-                    metadata['album'] = _extract_tag_value(audio_file.tags['album'])
-                if 'title' in audio_file.tags:
-                    metadata['title'] = _extract_tag_value(audio_file.tags['title'])
-        
-        else:
-            # Generic fallback - try common tag names
-            if hasattr(audio_file, 'tags') and audio_file.tags is not None:
-                tags = audio_file.tags
-                # Try various common tag formats
-                for artist_key in ['artist', 'ARTIST', 'TPE1', '\xa9ART']:
-                    if artist_key in tags:
-                        metadata['artist'] = _extract_tag_value(tags[artist_key])
-                        if metadata['artist']:
-                            break
-                
-                for album_key in ['album', 'ALBUM', 'TALB', '\xa9alb']:
-                    if album_key in tags:
-                        metadata['album'] = _extract_tag_value(tags[album_key])
-                        if metadata['album']:
-                            break
-                
-                for title_key in ['title', 'TITLE', 'TIT2', '\xa9nam']:
-                    if title_key in tags:
-                        metadata['title'] = _extract_tag_value(tags[title_key])
-                        if metadata['title']:
-                            break
+        return _read_tag_metadata(audio_file)
+    
+    except Exception as e:
+        raise Exception(f"Error reading metadata from {file_path}: {str(e)}")
+
+
+def probe_music_file(file_path: str) -> Tuple[bool, Dict[str, Optional[str]]]:
+    """
+    Check for embedded artwork and extract artist/album/title with a single file load.
+    
+    Args:
+        file_path: Path to the music file
+    
+    Returns:
+        Tuple of (has_artwork, metadata) where metadata has the same keys as
+        get_music_metadata()
+    """
+    if not MUTAGEN_AVAILABLE:
+        raise ImportError("mutagen is required. Install it with: pip install mutagen")
+    
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    try:
+        audio_file = open_audio_file(file_path)
+        if audio_file is None:
+            raise ValueError(f"Unsupported file format or corrupted file: {file_path}")
         
-        return metadata
+        has_artwork = _check_embedded_artwork(file_path, audio_file)
+        metadata = _read_tag_metadata(audio_file)
+        if has_artwork:
+            # Nothing will be embedded, so do not keep the load (and its pictures) around
+            forget_audio_file(file_path)
+        return has_artwork, metadata
     
     except Exception as e:
         raise Exception(f"Error reading metadata from {file_path}: {str(e)}")
 
+
+# Environment variable overriding the number of processes scan_library() uses
+SCAN_PARALLELISM_ENV = "YUMEBYO_SCAN_PARALLELISM"
+
+# Below this many files, starting worker processes costs more than it saves;
+# such batches are probed on threads instead, overlapping the disk reads
+_MIN_PARALLEL_SCAN = 64
+_SCAN_CHUNK_SIZE = 32
+_MAX_SCAN_THREADS = 32
+
+
+def _scan_one(file_path: str) -> Union[Tuple[bool, Dict[str, Optional[str]]], Exception]:
+    """Probe one file, returning the error instead of raising so a batch is never cut short."""
+    try:
+        return probe_music_file(file_path)
+    except Exception as e:
+        return e
+
+
+def _start_probes(
+    file_paths: Sequence[str],
+    workers: Optional[int]
+) -> Tuple[Optional[Executor], Iterator[Union[Tuple[bool, Dict[str, Optional[str]]], Exception]]]:
+    """
+    Start probing files in this process, on threads or across a process pool; see scan_library().
+    
+    Every file is submitted before this returns, so worker processes are
+    forked before the caller starts any threads that could hold a lock
+    (such as _audio_cache_lock) at fork time.
+    
+    Returns:
+        Tuple of (executor the caller must shut down, or None; iterator over
+        the results in input order)
+    """
+    if workers is None:
+        try:
+            workers = int(os.environ.get(SCAN_PARALLELISM_ENV, ""))
+        except ValueError:
+            workers = os.cpu_count() or 1
+    
+    if workers <= 1 or len(file_paths) <= 1:
+        return None, map(_scan_one, file_paths)
+    
+    if len(file_paths) < _MIN_PARALLEL_SCAN:
+        threads = min(_MAX_SCAN_THREADS, workers * 4, len(file_paths))
+        executor: Executor = ThreadPoolExecutor(max_workers=threads)
+        return executor, executor.map(_scan_one, file_paths)
+    
+    executor = ProcessPoolExecutor(max_workers=workers)
+    return executor, executor.map(_scan_one, file_paths, chunksize=_SCAN_CHUNK_SIZE)
+
+
+# Probe results are written to the scan cache in batches of this many files
+_SCAN_STORE_BATCH = 256
+
+
+def iter_scan_library(
+    file_paths: Sequence[str],
+    workers: Optional[int] = None,
+    use_cache: bool = True
+) -> Iterator[Tuple[str, Union[Tuple[bool, Dict[str, Optional[str]]], Exception]]]:
+    """
+    Probe many music files like scan_library(), yielding each result as soon as it is ready.
+    
+    Files found in the scan cache come first, then the probed files in input
+    order, so a caller can start working on early files while later ones are
+    still being parsed. The probes are all started before the first result
+    is yielded. A file's size and modification time are recorded for the
+    cache before its result is yielded, so a caller may modify the file
+    (e.g. embed artwork) right away without the stale result being kept.
+    
+    Args:
+        file_paths: Paths of the music files to probe
+        workers: Number of worker processes, as for scan_library()
+        use_cache: If True, reuse and store results in the scan cache
+    
+    Yields:
+        Tuples of (file_path, (has_artwork, metadata) or the exception raised
+        while probing it)
+    """
+    cached_scans = []
+    to_probe = []
+    if use_cache:
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                # Let the probe report the error
+                to_probe.append(file_path)
+                continue
+            cached = get_cached_scan(file_path, stat.st_mtime_ns, stat.st_size)
+            if cached is None:
+                to_probe.append(file_path)
+            else:
+                cached_scans.append((file_path, cached))
+    else:
+        to_probe = list(file_paths)
+    
+    executor, probes = _start_probes(to_probe, workers)
+    entries = []
+    try:
+        yield from cached_scans
+        
+        for file_path, probe in zip(to_probe, probes):
+            if use_cache and not isinstance(probe, Exception):
+                try:
+                    # Stat again: the probe saves the file when it strips non-square artwork
+                    stat = os.stat(file_path)
+                except OSError:
+                    pass
+                else:
+                    entries.append((file_path, stat.st_mtime_ns, stat.st_size, *probe))
+                    if len(entries) >= _SCAN_STORE_BATCH:
+                        store_scans(entries)
+                        entries = []
+            yield file_path, probe
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        store_scans(entries)
+
+
+def scan_library(
+    file_paths: Sequence[str],
+    workers: Optional[int] = None,
+    use_cache: bool = True
+) -> Dict[str, Union[Tuple[bool, Dict[str, Optional[str]]], Exception]]:
+    """
+    Probe many music files, spreading the mutagen parsing over several processes.
+    
+    Each file is loaded once for both the artwork check and the tag read, as
+    in probe_music_file(). Small batches are probed on threads in this
+    process, and workers <= 1 probes serially; both keep the loads cached
+    for a later embed.
+    
+    With use_cache, results are also stored on disk against each file's size
+    and modification time, and files unchanged since an earlier scan are not
+    parsed again.
+    
+    Args:
+        file_paths: Paths of the music files to probe
+        workers: Number of worker processes; defaults to the value of the
+            YUMEBYO_SCAN_PARALLELISM environment variable, or the CPU count
+        use_cache: If True, reuse and store results in the scan cache
+    
+    Returns:
+        Dictionary mapping each path, in input order, to its (has_artwork,
+        metadata) tuple or to the exception raised while probing it
+    """
+    results = dict.fromkeys(file_paths)
+    results.update(iter_scan_library(file_paths, workers, use_cache))
+    return results
@@ -0,0 +1,92 @@
+"""
+Persistent cache of per-file scan results keyed by path, size and mtime.
+
+Probing a file means loading its tags with mutagen, which dominates a rescan
+of a large library where almost nothing has changed. Each probe result (the
+artwork flag and the artist/album/title tags) is stored together with the
+file's st_mtime_ns and st_size; on the next run the file is only parsed
+again if either has changed. Entries are stored in a small SQLite database
+under ~/.cache/artwork_fetcher.
+"""
+
+import os
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+from .sqlite_cache import CACHE_DIR, CacheDatabase
+
+
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "scans.db")
+
+_database = CacheDatabase("scan cache", DEFAULT_CACHE_PATH, (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "CREATE TABLE IF NOT EXISTS scans ("
+    "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+    "has_artwork INTEGER NOT NULL, artist TEXT, album TEXT, title TEXT)",
+))
+
+
+def get_cached_scan(
+    file_path: str,
+    mtime_ns: int,
+    size: int
+) -> Optional[Tuple[bool, Dict[str, Optional[str]]]]:
+    """
+    Look up the stored probe result for a file.
+
+    Args:
+        file_path: Path to the music file
+        mtime_ns: The file's current st_mtime_ns
+        size: The file's current st_size
+
+    Returns:
+        Tuple of (has_artwork, metadata), or None if nothing is stored or the
+        file has changed since
+    """
+    with _database.connection() as connection:
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT has_artwork, artist, album, title FROM scans "
+                "WHERE path = ? AND mtime_ns = ? AND size = ?",
+                (file_path, mtime_ns, size)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+    if row is None:
+        return None
+    return bool(row[0]), {'artist': row[1], 'album': row[2], 'title': row[3]}
+
+
+def store_scans(entries: Iterable[Tuple[str, int, int, bool, Dict[str, Optional[str]]]]):
+    """
+    Store probe results in one transaction.
+
+    Args:
+        entries: Tuples of (file_path, mtime_ns, size, has_artwork, metadata)
+    """
+    rows = [
+        (file_path, mtime_ns, size, int(has_artwork), metadata.get('artist'), metadata.get('album'), metadata.get('title'))
+        for file_path, mtime_ns, size, has_artwork, metadata in entries
+    ]
+    if not rows:
+        return
+    with _database.connection() as connection:
+        if connection is None:
+            return
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO scans (path, mtime_ns, size, has_artwork, artist, album, title) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: could not write to scan cache: {e}")
+
+
+def close_scan_cache():
+    """Close the cache database."""
+    _database.close()
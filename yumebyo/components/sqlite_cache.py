@@ -0,0 +1,66 @@
+"""
+Shared connection handling for the SQLite caches under ~/.cache/artwork_fetcher.
+
+Each cache module keeps one CacheDatabase. The database is opened on first
+use, with its tables created, and the connection is shared by all threads
+behind a lock. If it cannot be opened, a warning is printed and callers get
+None, so a broken cache only costs the work it would have saved.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "artwork_fetcher")
+
+
+class CacheDatabase:
+    """A lazily opened, lock-guarded SQLite connection for one cache."""
+
+    def __init__(self, name: str, path: str, setup: Sequence[str]):
+        """
+        Args:
+            name: Name used in warnings, e.g. "cover cache"
+            path: Path of the database file
+            setup: SQL statements run each time the database is opened,
+                e.g. pragmas and CREATE TABLE IF NOT EXISTS
+        """
+        self.name = name
+        self.path = path
+        self._setup = tuple(setup)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use. Must be called with the lock held."""
+        if self._connection is None:
+            connection = None
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                for statement in self._setup:
+                    connection.execute(statement)
+                connection.commit()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Warning: {self.name} unavailable: {e}")
+                if connection is not None:
+                    connection.close()
+                return None
+            self._connection = connection
+        return self._connection
+
+    @contextmanager
+    def connection(self) -> Iterator[Optional[sqlite3.Connection]]:
+        """Hold the lock and yield the open connection, or None if the cache is unavailable."""
+        with self._lock:
+            yield self._open()
+
+    def close(self):
+        """Close the database; it is reopened on next use."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = None
@@ -2,36 +2,117 @@
 Browser management for Playwright-based artwork fetching.
 """
 
-from playwright.sync_api import Browser, BrowserContext, Playwright, sync_playwright
-from urllib.parse import urlencode, quote_plus
-from typing import Optional, List
+import queue
+from contextlib import contextmanager
+from urllib.parse import quote_plus
+from typing import TYPE_CHECKING, Iterator, Optional, List, Union
+
+# Playwright pulls in a large module tree, so it is only imported by
+# init_browser(); runs that never start a browser do not pay for it.
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext, Page, Playwright
 
 
 # Global references
-_p: Playwright = None
-_browser: Browser = None
-_context: BrowserContext = None
+_p: "Playwright" = None
+_browser: "Browser" = None
+_context: "BrowserContext" = None
+_page_pool: "queue.Queue[Page]" = None
+_pool_pages: "List[Page]" = []
+
+# Pages kept open in the shared context and reused for every lookup
+PAGE_POOL_SIZE = 4
+
+# Resource types the artwork lookup never needs; only <img src> attributes are read
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "stylesheet", "font", "media"})
 
 
-def init_browser():
-    """Initialize the Playwright browser and context."""
+def _block_heavy_resources(route):
+    """Abort requests for resources that are not needed to read the page's <img> tags."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def init_browser(page_pool_size: int = PAGE_POOL_SIZE):
+    """
+    Initialize the Playwright browser and context.
+    
+    The context lives until close_browser(), and its page pool is opened
+    here so the first lookup does not pay for creating pages.
+    
+    Args:
+        page_pool_size: Number of pages to keep open for lookups
+    """
     global _p, _browser, _context
+    from playwright.sync_api import sync_playwright
+
     _p = sync_playwright().start()
     _browser = _p.firefox.launch(headless=True)  # headless=True if you don't need to see it
     _context = _browser.new_context()
+    _context.route("**/*", _block_heavy_resources)
+    get_page_pool(page_pool_size)
     print("Browser started!")
 
 
-def get_context() -> BrowserContext:
+def is_browser_initialized() -> bool:
+    """Return True if init_browser() has been called and the browser is still open."""
+    return _context is not None
+
+
+def get_context() -> "BrowserContext":
     """Get the current browser context."""
     if _context is None:
         raise RuntimeError("Browser not initialized. Call init_browser() first.")
     return _context
 
 
+def get_page_pool(size: int = PAGE_POOL_SIZE) -> "queue.Queue[Page]":
+    """
+    Get the shared pool of open pages, creating it on first use.
+    
+    Args:
+        size: Number of pages to preallocate when the pool is created
+    
+    Returns:
+        Queue holding the idle pages
+    """
+    global _page_pool
+    if _page_pool is None:
+        context = get_context()
+        pool = queue.Queue()
+        for _ in range(size):
+            page = context.new_page()
+            _pool_pages.append(page)
+            pool.put(page)
+        _page_pool = pool
+    return _page_pool
+
+
+@contextmanager
+def acquire_page() -> "Iterator[Page]":
+    """Borrow a page from the pool and return it once the caller is done."""
+    pool = get_page_pool()
+    page = pool.get()
+    if page.is_closed():
+        # A crashed or closed page is replaced rather than handed out again
+        _pool_pages.remove(page)
+        page = get_context().new_page()
+        _pool_pages.append(page)
+    try:
+        yield page
+    finally:
+        pool.put(page)
+
+
 def close_browser():
     """Close the browser and clean up."""
-    global _p, _browser, _context
+    global _p, _browser, _context, _page_pool
+    # Pages are only returned to the pool once a lookup has finished with
+    # them, so there is nothing left to wait for before closing the context
+    if _context:
+        _context.close()
     if _browser:
         _browser.close()
     if _p:
@@ -39,11 +120,19 @@ def close_browser():
     _p = None
     _browser = None
     _context = None
+    _page_pool = None
+    _pool_pages.clear()
 
 """
 URL building utilities for artwork fetching.
 """
 
+# Sources queried for every file, already in the joined form the site expects
+MUSICHOARDERS_DEFAULT_SOURCES = "spotify,applemusic"
+
+# Fixed part of the per-file search URL built by build_musichoarders_search_url()
+_MUSICHOARDERS_SEARCH_PREFIX = f"https://covers.musichoarders.xyz?sources={quote_plus(MUSICHOARDERS_DEFAULT_SOURCES)}"
+
 
 
 
@@ -72,17 +161,14 @@ def build_youtube_url_with_params(
         Complete URL with query parameters
     """
     # Build the search query by combining artist and title
-    query_parts = []
-    if artist:
-        query_parts.append(artist)
-    if title:
-        query_parts.append(title)
+    if artist and title:
+        query = f"{artist} {title}"
+    else:
+        query = artist or title
     
-    if query_parts:
-        # Join with '+' and URL-encode the query
-        query = ' '.join(query_parts)
-        encoded_query = quote_plus(query)
-        return f"{base_url}{encoded_query}"
+    if query:
+        # Spaces become '+' in the URL-encoded query
+        return f"{base_url}{quote_plus(query)}"
     
     return base_url
 
@@ -90,7 +176,7 @@ def build_musichoarders_url_with_params(
     base_url: Optional[str] = "https://covers.musichoarders.xyz",
     theme: Optional[str] = None,
     resolution: Optional[str] = None,
-    sources: Optional[List[str]] = None,
+    sources: Optional[Union[str, List[str]]] = None,
     country: Optional[str] = None,
     artist: Optional[str] = None,
     album: Optional[str] = None,
@@ -106,7 +192,8 @@ def build_musichoarders_url_with_params(
         base_url: The base URL of the site
         theme: 'light' or 'dark'
         resolution: Resolution value
-        sources: List of sources (will be joined with commas, lowercase, no spaces/punctuation)
+        sources: List of sources (will be joined with commas, lowercase, no spaces/punctuation),
+            or an already joined and cleaned string such as MUSICHOARDERS_DEFAULT_SOURCES
         country: Country code
         artist: Artist name
         album: Album name
@@ -115,35 +202,63 @@ def build_musichoarders_url_with_params(
     Returns:
         Complete URL with query parameters
     """
-    params = {}
+    # Each part is already "key=value" with the value quoted as urlencode() would
+    parts: List[str] = []
     
-    if theme and theme.lower() in ['light', 'dark']:
-        params['theme'] = theme.lower()
+    if theme:
+        theme = theme.lower()
+        if theme in ('light', 'dark'):
+            parts.append(f"theme={theme}")
     
     if resolution:
-        params['resolution'] = resolution
+        parts.append(f"resolution={quote_plus(resolution)}")
     
     if sources:
-        # All sources are lowercase and contain no spaces, punctuation or symbols
-        sources_clean = [s.lower().strip() for s in sources if s]
-        params['sources'] = ','.join(sources_clean)
+        if isinstance(sources, str):
+            parts.append(f"sources={quote_plus(sources)}")
+        else:
+            # All sources are lowercase and contain no spaces, punctuation or symbols
+            sources_clean = [s.lower().strip() for s in sources if s]
+            parts.append(f"sources={quote_plus(','.join(sources_clean))}")
     
     if country:
-        params['country'] = country
+        parts.append(f"country={quote_plus(country)}")
     
     if artist:
-        params['artist'] = artist
+        parts.append(f"artist={quote_plus(artist)}")
     
     if album:
-        params['album'] = album
+        parts.append(f"album={quote_plus(album)}")
     
     if identifier:
-        params['identifier'] = identifier
+        parts.append(f"identifier={quote_plus(identifier)}")
+    
+    if not parts:
+        return base_url
     
     # Build the URL
-    if params:
-        query_string = urlencode(params)
-        separator = '&' if '?' in base_url else '?'
-        return f"{base_url}{separator}{query_string}"
+    separator = '&' if '?' in base_url else '?'
+    return f"{base_url}{separator}{'&'.join(parts)}"
+
+
+def build_musichoarders_search_url(artist: Optional[str] = None, album: Optional[str] = None) -> str:
+    """
+    Build the per-file search URL on the default base URL and sources.
     
-    return base_url
+    Produces the same URL as build_musichoarders_url_with_params(
+    sources=MUSICHOARDERS_DEFAULT_SOURCES, artist=artist, album=album), but only
+    quotes the two values that change instead of running the general builder.
+    
+    Args:
+        artist: Artist name
+        album: Album name
+    
+    Returns:
+        Complete URL with query parameters
+    """
+    url = _MUSICHOARDERS_SEARCH_PREFIX
+    if artist:
+        url += f"&artist={quote_plus(artist)}"
+    if album:
+        url += f"&album={quote_plus(album)}"
+    return url
@@ -8,15 +8,23 @@ and gracefully degrades when the dependency is not installed.
 
 from __future__ import annotations
 
+import copy
 import io
-from typing import Any, Dict, List, Optional
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from .http_client import get_session, read_streamed_content
+from .youtube_music.fast_json import install_orjson_decoder
 
 
 try:
     from ytmusicapi import YTMusic  # type: ignore
     YTMUSIC_AVAILABLE = True
+    install_orjson_decoder()
 except ImportError:
     YTMUSIC_AVAILABLE = False
     YTMusic = None  # type: ignore
@@ -32,8 +40,20 @@ except ImportError:  # pragma: no cover - optional dependency warning only
     PIL_AVAILABLE = False
     print("Warning: Pillow not installed. Install it with: pip install pillow")
 
+try:
+    import pyvips  # type: ignore
+
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):  # pragma: no cover - optional accelerator, PIL is used instead
+    pyvips = None  # type: ignore
+    PYVIPS_AVAILABLE = False
+
 
 _client: Optional["YTMusic"] = None
+_client_lock = threading.Lock()
+
+# Distinct (artist, title, limit) searches remembered for the life of the process
+SEARCH_CACHE_SIZE = 4096
 
 
 def init_youtube_music_client(auth_headers_path: Optional[str] = None) -> "YTMusic":
@@ -46,15 +66,18 @@ def init_youtube_music_client(auth_headers_path: Optional[str] = None) -> "YTMus
 
     global _client
 
-    if _client is not None:
-        return _client
+    # Thumbnail downloads run on worker threads; only one of them may build the client
+    with _client_lock:
+        if _client is not None:
+            return _client
 
-    if auth_headers_path:
-        _client = YTMusic(auth_headers_path)
-    else:
-        _client = YTMusic()
+        # API calls go through the shared pooled session, like every other request
+        if auth_headers_path:
+            _client = YTMusic(auth_headers_path, requests_session=get_session())
+        else:
+            _client = YTMusic(requests_session=get_session())
 
-    return _client
+        return _client
 
 
 def get_youtube_music_client() -> "YTMusic":
@@ -70,49 +93,75 @@ def _select_highest_quality_thumbnail_url(
 ) -> Optional[str]:
     """Return the URL for the thumbnail with the largest pixel area."""
 
-    best_url: Optional[str] = None
-    best_area = -1
+    to_int = int
+    candidates = [
+        (to_int(thumb.get("width", 0) or 0) * to_int(thumb.get("height", 0) or 0), thumb["url"])
+        for thumb in thumbnails
+        if isinstance(thumb, dict) and thumb.get("url")
+    ]
+    best_area, best_url = max(candidates, key=itemgetter(0), default=(0, None))
+    return best_url if best_area > 0 else None
 
-    for thumb in thumbnails:
-        if not isinstance(thumb, dict):
-            continue
 
-        url = thumb.get("url")
-        width = int(thumb.get("width", 0) or 0)
-        height = int(thumb.get("height", 0) or 0)
+def _download_thumbnail(url: str) -> bytes:
+    """Download raw image bytes for a thumbnail URL."""
 
-        if not url or width <= 0 or height <= 0:
-            continue
+    if not url:
+        raise ValueError("No thumbnail URL provided for download.")
 
-        area = width * height
-        if area > best_area:
-            best_area = area
-            best_url = url
+    with get_session().get(url, timeout=15, stream=True) as response:
+        response.raise_for_status()
+        return read_streamed_content(response)
 
-    return best_url
 
+def _crop_image_bytes_to_square_with_vips(image_bytes: bytes) -> bytes:
+    """
+    Centre-crop with libvips.
 
-def _download_thumbnail(url: str) -> bytes:
-    """Download raw image bytes for a thumbnail URL."""
+    The image is read sequentially and only the square region is decoded
+    into the output, instead of materialising the full RGB frame first.
+    """
 
-    if not url:
-        raise ValueError("No thumbnail URL provided for download.")
+    img = pyvips.Image.new_from_buffer(image_bytes, "", access="sequential")
+    width, height = img.width, img.height
+
+    # Only the header has been read so far; a square JPEG needs no work
+    if width == height and img.get("vips-loader").startswith("jpegload"):
+        return image_bytes
+
+    if width != height:
+        side = min(width, height)
+        img = img.crop((width - side) // 2, (height - side) // 2, side, side)
+
+    if img.hasalpha():
+        img = img.flatten()
+    if img.interpretation != "srgb":
+        img = img.colourspace("srgb")
 
-    response = requests.get(url, timeout=15)
-    response.raise_for_status()
-    return response.content
+    return img.jpegsave_buffer(Q=95, strip=True, optimize_coding=True)
 
 
 def _crop_image_bytes_to_square(image_bytes: bytes) -> bytes:
     """Return the supplied image bytes centre-cropped to a square."""
 
+    if PYVIPS_AVAILABLE:
+        try:
+            return _crop_image_bytes_to_square_with_vips(image_bytes)
+        except pyvips.Error:
+            pass  # Let PIL try formats libvips was built without
+
     if not PIL_AVAILABLE or Image is None:
         return image_bytes
 
     with Image.open(io.BytesIO(image_bytes)) as img:
-        img = img.convert("RGB")
         width, height = img.size
 
+        # Image.open has only parsed the header; a square JPEG is returned as is
+        if width == height and img.format == "JPEG":
+            return image_bytes
+
+        img = img.convert("RGB")
+
         if width == height:
             buffer = io.BytesIO()
             img.save(buffer, format="JPEG", quality=95)
@@ -160,14 +209,7 @@ def download_best_thumbnail_image(
 ) -> Optional[bytes]:
     """Download and process the best thumbnail for the supplied metadata."""
 
-    if not isinstance(metadata, dict):
-        return None
-
-    best_url = metadata.get("bestThumbnailUrl")
-    thumbnails = metadata.get("thumbnails")
-    if not best_url and isinstance(thumbnails, list):
-        best_url = _select_highest_quality_thumbnail_url(thumbnails)
-
+    best_url = _best_thumbnail_url_for(metadata)
     if not best_url:
         return None
 
@@ -180,13 +222,93 @@ def download_best_thumbnail_image(
     return image_bytes
 
 
+def _best_thumbnail_url_for(metadata: Dict[str, Any]) -> Optional[str]:
+    """Return the best thumbnail URL of a normalised search result, if it has one."""
+
+    if not isinstance(metadata, dict):
+        return None
+
+    best_url = metadata.get("bestThumbnailUrl")
+    thumbnails = metadata.get("thumbnails")
+    if not best_url and isinstance(thumbnails, list):
+        best_url = _select_highest_quality_thumbnail_url(thumbnails)
+    return best_url
+
+
+def download_best_thumbnails(
+    metadatas: List[Dict[str, Any]],
+    downscale_to_480: bool = False,
+    max_workers: int = 16,
+) -> List[Optional[bytes]]:
+    """
+    Download and process the best thumbnail for several search results concurrently.
+
+    Downloads and crops run as two stages: up to max_workers threads fetch
+    over the pooled HTTP session, and each finished download is cropped on a
+    second pool sized to the CPU count, so decoding overlaps with the
+    downloads still in flight without more decodes running than there are
+    cores. PIL and libvips release the GIL while decoding and encoding, so
+    threads are enough.
+
+    Returns:
+        One entry per metadata dict, in the same order; None where no
+        thumbnail was found or the download or crop failed
+    """
+
+    if len(metadatas) <= 1:
+        results: List[Optional[bytes]] = []
+        for metadata in metadatas:
+            try:
+                results.append(download_best_thumbnail_image(metadata, downscale_to_480))
+            except Exception as e:
+                print(f"Warning: could not download thumbnail: {e}")
+                results.append(None)
+        return results
+
+    results = [None] * len(metadatas)
+
+    def download(metadata: Dict[str, Any]) -> Optional[bytes]:
+        best_url = _best_thumbnail_url_for(metadata)
+        if not best_url:
+            return None
+        try:
+            return _download_thumbnail(best_url)
+        except Exception as e:
+            print(f"Warning: could not download thumbnail: {e}")
+            return None
+
+    def crop(index: int, image_bytes: bytes):
+        try:
+            results[index] = _crop_image_bytes_to_square(image_bytes)
+        except Exception as e:
+            print(f"Warning: could not process thumbnail: {e}")
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as crop_executor:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(metadatas))) as download_executor:
+            downloads = {
+                download_executor.submit(download, metadata): index
+                for index, metadata in enumerate(metadatas)
+            }
+            for future in as_completed(downloads):
+                image_bytes = future.result()
+                if image_bytes:
+                    crop_executor.submit(crop, downloads[future], image_bytes)
+
+    return results
+
+
 def search_youtube_music_metadata(
     artist: Optional[str] = None,
     title: Optional[str] = None,
     limit: int = 5,
     ensure_client: bool = True
 ) -> List[Dict[str, Any]]:
-    """Search YouTube Music for tracks matching the provided metadata."""
+    """
+    Search YouTube Music for tracks matching the provided metadata.
+
+    Results are cached per (artist, title, limit), so repeated lookups of the
+    same track within a run do not hit the network again.
+    """
 
     if not YTMUSIC_AVAILABLE:
         raise ImportError(
@@ -199,6 +321,19 @@ def search_youtube_music_metadata(
     if limit <= 0:
         raise ValueError("limit must be greater than zero.")
 
+    # Deep-copy the cached entries, including the artists and thumbnails lists
+    # and each thumbnail dict, so callers cannot change what later lookups get
+    return copy.deepcopy(list(_search_youtube_music_metadata_cached(artist, title, limit)))
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _search_youtube_music_metadata_cached(
+    artist: Optional[str],
+    title: Optional[str],
+    limit: int
+) -> Tuple[Dict[str, Any], ...]:
+    """Run a search and normalise its results; memoised per (artist, title, limit)."""
+
     query_parts: List[str] = []
     if artist:
         query_parts.append(artist)
@@ -207,15 +342,13 @@ def search_youtube_music_metadata(
 
     query = " ".join(query_parts)
 
-    client = get_youtube_music_client() if ensure_client else None
-    if client is None:
-        client = init_youtube_music_client()
+    client = get_youtube_music_client()
 
-    # INSERT_YOUR_CODE
-    # Choose the search filter based on whether artist appears to be "nightcore"
+    # Choose the search filter based on whether artist or title appears to be "nightcore".
+    # The query already joins both with a space, which "nightcore" cannot span.
     search_filter = "songs"
 
-    if artist is not None and "nightcore" in artist.lower() or title is not None and "nightcore" in title.lower():
+    if "nightcore" in query.lower():
         search_filter = "videos"
         print(f"search in videos")
     search_results = client.search(query, filter=search_filter, limit=limit)
@@ -235,13 +368,16 @@ def search_youtube_music_metadata(
         if isinstance(album_entry, dict):
             album_name = album_entry.get("name")
 
-        thumbnails = item.get("thumbnails", [])
-        best_thumbnail_url = _select_highest_quality_thumbnail_url(thumbnails)
-        sorted_thumbnails = sorted(
-            [thumb for thumb in thumbnails if isinstance(thumb, dict)],
-            key=lambda thumb: int(thumb.get("width", 0) or 0)
-            * int(thumb.get("height", 0) or 0),
-            reverse=True,
+        # Compute each thumbnail's area once for both the ordering and the best pick
+        decorated = [
+            (int(thumb.get("width", 0) or 0) * int(thumb.get("height", 0) or 0), thumb)
+            for thumb in item.get("thumbnails", [])
+            if isinstance(thumb, dict)
+        ]
+        decorated.sort(key=itemgetter(0), reverse=True)
+        sorted_thumbnails = [thumb for _, thumb in decorated]
+        best_thumbnail_url = next(
+            (thumb["url"] for area, thumb in decorated if area > 0 and thumb.get("url")), None
         )
 
         normalised_results.append(
@@ -258,7 +394,7 @@ def search_youtube_music_metadata(
             }
         )
 
-    return normalised_results
+    return tuple(normalised_results)
 
 
 def fetch_primary_youtube_music_metadata(
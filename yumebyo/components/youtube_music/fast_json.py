@@ -0,0 +1,65 @@
+"""
+orjson-backed response decoding for ytmusicapi.
+
+ytmusicapi decodes every API response with `json.loads(response.text)`.
+Song payloads from get_song() carry large microformat/streaming blocks, and
+orjson parses them several times faster than the standard library. When
+orjson is installed, install_orjson_decoder() points the `json` name inside
+ytmusicapi's client module at a proxy whose `loads` is orjson's; everything
+else still resolves to the standard library. Without orjson nothing changes.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson  # type: ignore
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None  # type: ignore
+    ORJSON_AVAILABLE = False
+
+
+class _OrjsonDecoder:
+    """Stand-in for the json module that decodes with orjson."""
+
+    @staticmethod
+    def loads(data: Any, **kwargs) -> Any:
+        if kwargs:
+            return json.loads(data, **kwargs)
+        return orjson.loads(data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(json, name)
+
+
+_installed = False
+
+
+def install_orjson_decoder() -> bool:
+    """
+    Make ytmusicapi decode responses with orjson.
+
+    Safe to call more than once.
+
+    Returns:
+        True if orjson decoding is active, False if orjson or the expected
+        ytmusicapi module layout is unavailable
+    """
+    global _installed
+    if _installed:
+        return True
+    if not ORJSON_AVAILABLE:
+        return False
+
+    try:
+        from ytmusicapi import ytmusic as ytmusic_module  # type: ignore
+    except ImportError:
+        return False
+
+    if getattr(ytmusic_module, "json", None) is not json:
+        return False
+
+    ytmusic_module.json = _OrjsonDecoder()
+    _installed = True
+    return True
@@ -12,10 +12,16 @@ the highest resolution thumbnail that the API exposes.
 from __future__ import annotations
 import argparse
 import os
+import re
+import threading
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
-import requests
+from typing import Any, Dict, Optional, Tuple
 from ytmusicapi import YTMusic
+from .fast_json import install_orjson_decoder
+from ..http_client import get_session
+from .thumbnail_url_cache import get_cached_thumbnail_url, store_thumbnail_url
 try:
     from PIL import Image  # type: ignore
 
@@ -25,12 +31,64 @@ except ImportError:  # pragma: no cover - optional dependency warning only
     PIL_AVAILABLE = False
     print("Warning: Pillow not installed. Install it with: pip install pillow")
 
+install_orjson_decoder()
+
+_ytmusic_client: Optional[YTMusic] = None
+_ytmusic_lock = threading.Lock()
+
+
+def _ytmusic() -> YTMusic:
+    """Return the shared YTMusic client, creating it on first use."""
+    global _ytmusic_client
+    if _ytmusic_client is None:
+        with _ytmusic_lock:
+            if _ytmusic_client is None:
+                # Share the pooled session so search and get_song calls reuse open connections
+                _ytmusic_client = YTMusic(requests_session=get_session())
+    return _ytmusic_client
+
+
+# Size options at the end of Google image CDN URLs, e.g. "=w544-h544-l90-rj"
+_CDN_SIZE_PATTERN = re.compile(r"=w(\d+)-h(\d+)([^/=]*)$")
+
+
+def sized_thumbnail_url(url: str, size: int) -> str:
+    """
+    Ask the image CDN for a size x size rendition of a square thumbnail.
+
+    YouTube Music album art is served from Google's image CDN, which scales
+    the image to the size given in the URL, so a 480x480 cover can be fetched
+    instead of downloading the largest one and resizing it locally. URLs
+    without size options (e.g. i.ytimg.com video thumbnails), non-square
+    images and images already no larger than size are returned unchanged.
+    """
+
+    match = _CDN_SIZE_PATTERN.search(url)
+    if match is None:
+        return url
+    width, height = int(match.group(1)), int(match.group(2))
+    if width != height or width <= size:
+        return url
+    return f"{url[:match.start()]}=w{size}-h{size}{match.group(3)}"
+
+
+def has_search_terms(artist: Optional[str], title: Optional[str]) -> bool:
+    """
+    Return True if both artist and title have non-blank text to search for.
+
+    A search for just one of them returns unrelated tracks, so callers should
+    skip YouTube Music for tracks where this is False.
+    """
+
+    return bool(artist and artist.strip() and title and title.strip())
 
 
 def get_thumbnail_url(
 artist: str, 
 title: str,
-filter: str = "songs"
+filter: str = "songs",
+use_cache: bool = True,
+size: Optional[int] = None
 ) -> str:
     """
     Get the thumbnail URL for a YouTube Music song/video.
@@ -39,17 +97,59 @@ filter: str = "songs"
         artist: The artist name
         title: The song title
         filter: The filter to use to search for the songs/videos
+        use_cache: If True, reuse and store lookups in the on-disk thumbnail cache
+        size: If given, return the URL of a size x size rendition of the
+            thumbnail where the CDN supports it; see sized_thumbnail_url()
     
     Returns:
         The thumbnail URL
+
+    Raises:
+        ValueError: If artist or title is empty; a search for just one of
+            them returns unrelated tracks
     """
 
-    ytmusic = YTMusic()
-    query = f"{artist} {title}"
+    if not has_search_terms(artist, title):
+        raise ValueError(f"Both artist and title are needed to search YouTube Music (got {artist!r}, {title!r})")
+
+    thumbnail_url = _cached_or_looked_up_thumbnail_url(artist, title, filter, use_cache)
+    if size is not None:
+        thumbnail_url = sized_thumbnail_url(thumbnail_url, size)
+    return thumbnail_url
+
+
+def _cached_or_looked_up_thumbnail_url(artist: str, title: str, filter: str, use_cache: bool) -> str:
+    """Return the largest thumbnail URL from the thumbnail cache, or look it up and store it."""
+
+    if use_cache:
+        hit, cached_url = get_cached_thumbnail_url(artist, title, filter)
+        if hit:
+            if cached_url is None:
+                raise LookupError(f"No thumbnail found on YouTube Music for {artist!r} {title!r} (cached)")
+            return cached_url
+
+    try:
+        thumbnail_url = _lookup_thumbnail_url(artist, title, filter)
+    except LookupError:
+        if use_cache:
+            store_thumbnail_url(artist, title, filter, None)
+        raise
+
+    if use_cache:
+        store_thumbnail_url(artist, title, filter, thumbnail_url)
+    return thumbnail_url
+
+
+def _lookup_thumbnail_url(artist: str, title: str, filter: str) -> str:
+    """Search YouTube Music and return the largest thumbnail URL of the top result."""
+
+    ytmusic = _ytmusic()
+    # Collapse stray whitespace in the tags so equal queries share search cache entries
+    query = " ".join(f"{artist} {title}".split())
     resolved_video_id = _get_video_id(ytmusic, query=query, filter=filter)
 
     song_payload = ytmusic.get_song(resolved_video_id)
-    thumbnail_url = _fetch_highest_quality_thumbnail_url(_iter_thumbnails(song_payload))
+    thumbnail_url = _best_thumbnail_url(song_payload)
 
     if not thumbnail_url:
         raise LookupError(
@@ -60,85 +160,105 @@ filter: str = "songs"
 
     
 
-def _iter_thumbnails(song_payload: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
-    """Yield all thumbnail dictionaries available for the supplied payload."""
-
-    if not isinstance(song_payload, dict):
-        return
-
-    video_details = song_payload.get("videoDetails")
-    if isinstance(video_details, dict):
-        thumbnail_block = video_details.get("thumbnail")
-        if isinstance(thumbnail_block, dict):
-            thumbnails = thumbnail_block.get("thumbnails")
-            if isinstance(thumbnails, list):
-                for thumb in thumbnails:
-                    if isinstance(thumb, dict):
-                        yield thumb
-
-    microformat = song_payload.get("microformat")
-    if isinstance(microformat, dict):
-        renderer = microformat.get("microformatDataRenderer")
-        if isinstance(renderer, dict):
-            thumbnail_block = renderer.get("thumbnail")
-            if isinstance(thumbnail_block, dict):
-                thumbnails = thumbnail_block.get("thumbnails")
-                if isinstance(thumbnails, list):
-                    for thumb in thumbnails:
-                        if isinstance(thumb, dict):
-                            yield thumb
-
-
-def _fetch_highest_quality_thumbnail_url(thumbnails: Iterable[Dict[str, Any]]) -> Optional[str]:
-    """Return the URL for the thumbnail with the largest pixel area."""
-
-    best_url: Optional[str] = None
-    best_area = -1
-
-    for thumb in thumbnails:
-        if not isinstance(thumb, dict):
-            continue
-
-        url = thumb.get("url")
-        width = int(thumb.get("width", 0) or 0)
-        height = int(thumb.get("height", 0) or 0)
-
-        if not url or width <= 0 or height <= 0:
-            continue
-
-        area = width * height
-        if area > best_area:
-            best_area = area
-            best_url = url
+# Where get_song() payloads list thumbnails
+_THUMBNAIL_PATHS = (
+    ("videoDetails", "thumbnail", "thumbnails"),
+    ("microformat", "microformatDataRenderer", "thumbnail", "thumbnails"),
+)
+
+
+def _iter_thumbnails(song_payload: Dict[str, Any]):
+    """Yield every thumbnail dict listed at one of _THUMBNAIL_PATHS."""
+
+    for path in _THUMBNAIL_PATHS:
+        node = song_payload
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+        if isinstance(node, list):
+            for thumb in node:
+                if isinstance(thumb, dict):
+                    yield thumb
+
 
+def _best_thumbnail_url(song_payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Return the URL of the largest thumbnail in a get_song() payload.
+
+    Thumbnails are listed under both videoDetails.thumbnail and
+    microformat.microformatDataRenderer.thumbnail; both lists are scanned in
+    one pass, keeping the entry with the largest pixel area.
+    """
+
+    sizes = (
+        (thumb["url"], int(thumb.get("width", 0) or 0), int(thumb.get("height", 0) or 0))
+        for thumb in _iter_thumbnails(song_payload)
+        if thumb.get("url")
+    )
+    _, best_url = max(
+        ((width * height, url) for url, width, height in sizes if width > 0 and height > 0),
+        key=itemgetter(0),
+        default=(0, None)
+    )
     return best_url
 
 
+# Searches remembered for the rest of the run, including those that found nothing
+SEARCH_CACHE_SIZE = 4096
+
+# Results requested from the unfiltered search the video ID is picked from
+SEARCH_LIMIT = 5
+
+# resultType of the search results each search filter stands for
+_RESULT_TYPES = {"songs": "song", "videos": "video"}
+
+
+@lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def _search(ytmusic: YTMusic, query: str) -> Tuple[Dict[str, Any], ...]:
+    """
+    Run an unfiltered YouTube Music search.
+
+    Memoised per (client, query), so the "songs" and "videos" lookups of the
+    same track share one search, and a track that keeps finding nothing is
+    only searched once per run.
+    """
+
+    return tuple(ytmusic.search(query, limit=SEARCH_LIMIT))
+
+
 def _get_video_id(
 ytmusic: YTMusic, 
 query: Optional[str], 
 filter: str = "songs"
 ) -> str:
-    """Locate a YouTube Music video ID from either a direct ID or a search query."""
+    """
+    Locate a YouTube Music video ID from a search query.
+
+    One unfiltered search is made and the first result of the type the filter
+    asks for is used, falling back to the first result with a video ID; this
+    replaces a filtered search followed by an unfiltered one when the first
+    found nothing.
+    """
 
     if not query:
         raise ValueError("Either --query or --video-id must be provided.")
 
-    search_results = ytmusic.search(query, filter=filter, limit=1)
-    if not search_results:
-        search_results = ytmusic.search(query, limit=1)
-
+    search_results = _search(ytmusic, query)
     if not search_results:
         raise LookupError(f"No results found on YouTube Music for query: {query!r}")
 
-    result = search_results[0]
-    video_id = result.get("videoId")
-    if not video_id:
+    # Artist, album and playlist cards have no videoId, so only results with one count
+    playable = [result for result in search_results if result.get("videoId")]
+    if not playable:
         raise LookupError(
-            f"The top search result for query {query!r} did not contain a videoId."
+            f"No search result for query {query!r} contained a videoId."
         )
 
-    return video_id
+    wanted_type = _RESULT_TYPES.get(filter)
+    result = next(
+        (result for result in playable if result.get("resultType") == wanted_type),
+        playable[0]
+    )
+    return result["videoId"]
 
 
 
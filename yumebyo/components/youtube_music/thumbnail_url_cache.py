@@ -0,0 +1,85 @@
+"""
+Persistent cache of YouTube Music thumbnail lookups keyed by (artist, title, filter).
+
+get_thumbnail_url() needs a search and a get_song round-trip per track, and
+library re-runs repeat the same queries. The resulting URL is stored in a
+small SQLite database under ~/.cache/artwork_fetcher for a week; searches
+that found nothing are remembered for an hour so they are retried later
+without hammering the API in the meantime.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Optional, Tuple
+
+from ..sqlite_cache import CACHE_DIR, CacheDatabase
+
+
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "thumbnails.db")
+
+# Seconds a found URL, and a search without a usable result, stay valid
+FOUND_TTL = 7 * 24 * 60 * 60
+NOT_FOUND_TTL = 60 * 60
+
+_database = CacheDatabase("thumbnail cache", DEFAULT_CACHE_PATH, (
+    "CREATE TABLE IF NOT EXISTS thumbnails ("
+    "key TEXT PRIMARY KEY, url TEXT, expires REAL NOT NULL)",
+    # Drop entries that expired since the last run so the file does not keep growing
+    "DELETE FROM thumbnails WHERE expires <= CAST(strftime('%s', 'now') AS REAL)",
+))
+
+
+def _cache_key(artist: str, title: str, filter: str) -> str:
+    """Return the database key for a lookup."""
+    return hashlib.sha1(f"{artist}\x00{title}\x00{filter}".encode("utf-8")).hexdigest()
+
+
+def get_cached_thumbnail_url(artist: str, title: str, filter: str) -> Tuple[bool, Optional[str]]:
+    """
+    Look up a previous thumbnail lookup.
+
+    Args:
+        artist: Artist name
+        title: Song title
+        filter: Search filter the lookup used
+
+    Returns:
+        Tuple of (hit, url). hit is False if nothing valid is cached; on a
+        hit, url is None if the earlier lookup found no thumbnail
+    """
+    with _database.connection() as connection:
+        if connection is None:
+            return False, None
+        try:
+            row = connection.execute(
+                "SELECT url FROM thumbnails WHERE key = ? AND expires > ?",
+                (_cache_key(artist, title, filter), time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            return False, None
+    if row is None:
+        return False, None
+    return True, row[0]
+
+
+def store_thumbnail_url(artist: str, title: str, filter: str, url: Optional[str]):
+    """Store the outcome of a lookup; url is None for a search that found nothing."""
+    expires = time.time() + (FOUND_TTL if url else NOT_FOUND_TTL)
+    with _database.connection() as connection:
+        if connection is None:
+            return
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO thumbnails (key, url, expires) VALUES (?, ?, ?)",
+                (_cache_key(artist, title, filter), url, expires)
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: could not write to thumbnail cache: {e}")
+
+
+def close_thumbnail_url_cache():
+    """Close the cache database."""
+    _database.close()
@@ -1,12 +1,223 @@
 import os
-from typing import Dict, List, Optional
+import queue
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple, Union
 from .components.localMusicScanner import get_local_music_file_paths
-from .components.localMusicScanner import has_embedded_artwork, get_music_metadata, MUTAGEN_AVAILABLE
-from .components.webMetadataFetcher import build_musichoarders_url_with_params
-from .components.downloadedCoverProcessor import embed_artwork, download_and_embed_artwork
-from .components.images.download_and_embed_using_url import download_and_embed_artwork_using_url
-from .components.cover_processor import fetch_and_process_primary_cover
-from .components.youtube_music.get_thumbnail_url import get_thumbnail_url
+from .components.localMusicScanner import iter_scan_library, MUTAGEN_AVAILABLE
+from .components.webMetadataFetcher import build_musichoarders_search_url
+from .components.webMetadataFetcher import is_browser_initialized
+from .components.downloadedCoverProcessor import embed_artwork
+from .components.downloadedCoverProcessor import fetch_first_artwork_image
+from .components.downloadedCoverProcessor import fetch_first_artwork_image_over_http, fetch_first_artwork_image_in_browser
+from .components.downloadedCoverProcessor import download_artwork_image, guess_image_mime_type, sniff_image_mime_type
+from .components.cover_cache import get_cached_cover, store_cover
+from .components.images.download_and_embed_using_url import download_processed_artwork
+from .components.youtube_music.get_thumbnail_url import get_thumbnail_url, has_search_terms
+
+
+# Fan-made edits that are usually only uploaded as videos, not released as songs
+_VIDEO_SEARCH_HINTS = frozenset({"nightcore", "sped up", "slowed"})
+
+
+def _youtube_search_filter(metadata: Dict[str, Optional[str]]) -> str:
+    """Return the YouTube Music search filter to use for the given metadata."""
+
+    # Lowercase both tags once; the newline keeps a hint from spanning artist and title
+    text = f"{metadata['artist'] or ''}\n{metadata['title'] or ''}".lower()
+    if any(hint in text for hint in _VIDEO_SEARCH_HINTS):
+        return "videos"
+    return "songs"
+
+
+# Buffered progress lines are written out once this many have been collected
+_LOG_FLUSH_LINES = 256
+
+
+def _write_lines(lines: List[str]):
+    """Write buffered progress lines to stdout in one call and clear the buffer."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        lines.clear()
+
+
+def _album_key(metadata: Dict[str, Optional[str]]) -> Optional[Tuple[str, str]]:
+    """Return the (artist, album) pair tracks share a cover by, or None if either is missing."""
+
+    if metadata['artist'] and metadata['album']:
+        return metadata['artist'], metadata['album']
+    return None
+
+
+def _musichoarders_cover(
+    metadata: Dict[str, Optional[str]],
+    image_url: Optional[str],
+    use_cover_cache: bool
+) -> Optional[Tuple[bytes, str]]:
+    """Download the image found on the MusicHoarders page, storing it in the cover cache."""
+
+    if not image_url:
+        return None
+    image_data = download_artwork_image(image_url)
+    if not image_data:
+        return None
+    mime_type = guess_image_mime_type(image_url, image_data)
+    album_key = _album_key(metadata)
+    if use_cover_cache and album_key:
+        store_cover(*album_key, image_data, mime_type)
+    return image_data, mime_type
+
+
+def _youtube_music_cover(
+    metadata: Dict[str, Optional[str]],
+    image_url: Optional[str],
+    use_cover_cache: bool
+) -> Optional[Tuple[bytes, str]]:
+    """Download the YouTube Music thumbnail of the track, cropped to a square."""
+
+    # A search for only the artist or only the title finds unrelated tracks
+    if not has_search_terms(metadata['artist'], metadata['title']):
+        return None
+
+    youtube_thumbnail_url = get_thumbnail_url(
+        artist=metadata['artist'],
+        title=metadata['title'],
+        filter=_youtube_search_filter(metadata),
+        use_cache=use_cover_cache
+    )
+    image_data = download_processed_artwork(youtube_thumbnail_url)
+    if not image_data:
+        return None
+    return image_data, sniff_image_mime_type(image_data) or 'image/jpeg'
+
+
+# Where covers come from, tried in order until one is embedded. Each source
+# takes (metadata, MusicHoarders image URL or None, use_cover_cache) and
+# returns (image_data, mime_type) or None.
+_COVER_SOURCES = (
+    ("MusicHoarders", _musichoarders_cover),
+    ("YouTube Music", _youtube_music_cover),
+)
+
+
+def _embed_cover(
+    file_path: str,
+    metadata: Dict[str, Optional[str]],
+    image_url: Union[str, "Future[Optional[str]]", None],
+    cached_cover: Optional[Tuple[bytes, str]] = None,
+    use_cover_cache: bool = True
+) -> Tuple[str, bool, str]:
+    """
+    Embed a cached cover if given, otherwise the first cover _COVER_SOURCES produces.
+
+    Runs on a worker thread, so it must not touch the Playwright browser.
+    image_url may be a pending page lookup, which is waited on here.
+
+    Returns:
+        Tuple of (file_path, success, short description of the outcome)
+    """
+    try:
+        if isinstance(image_url, Future):
+            try:
+                image_url = image_url.result()
+            except Exception:
+                image_url = None
+
+        if cached_cover and embed_artwork(file_path, *cached_cover):
+            return file_path, True, "Embedded cached artwork"
+
+        for source_name, fetch_cover in _COVER_SOURCES:
+            cover = fetch_cover(metadata, image_url, use_cover_cache)
+            if cover and embed_artwork(file_path, *cover):
+                return file_path, True, f"Embedded artwork from {source_name}"
+        return file_path, False, "Failed to embed artwork"
+
+    except Exception as e:
+        return file_path, False, f"Error embedding artwork: {e}"
+
+
+def _submit_embed(
+    executor: ThreadPoolExecutor,
+    file_path: str,
+    metadata: Dict[str, Optional[str]],
+    image_url: Union[str, "Future[Optional[str]]", None],
+    cached_cover: Optional[Tuple[bytes, str]] = None,
+    use_cover_cache: bool = True
+) -> "Future[Tuple[str, bool, str]]":
+    """
+    Queue _embed_cover for a file on the embed pool.
+
+    If the page lookup is still pending, the file is only queued once it
+    finishes, so embed workers keep downloading and saving ready files instead
+    of sitting on lookups.
+
+    Returns:
+        Future resolving to _embed_cover's result
+    """
+    if not isinstance(image_url, Future) or image_url.done():
+        return executor.submit(_embed_cover, file_path, metadata, image_url, cached_cover, use_cover_cache)
+
+    outcome: "Future[Tuple[str, bool, str]]" = Future()
+
+    def _relay(embed: Future):
+        error = embed.exception()
+        if error is not None:
+            outcome.set_exception(error)
+        else:
+            outcome.set_result(embed.result())
+
+    def _on_lookup_done(lookup: Future):
+        executor.submit(
+            _embed_cover, file_path, metadata, lookup, cached_cover, use_cover_cache
+        ).add_done_callback(_relay)
+
+    image_url.add_done_callback(_on_lookup_done)
+    return outcome
+
+
+def _lookup_with_browser_fallback(
+    lookup_executor: ThreadPoolExecutor,
+    artwork_url: str,
+    browser_requests: "queue.Queue[Tuple[str, Future]]"
+) -> "Future[Optional[str]]":
+    """
+    Start a page lookup over HTTP, leaving the browser fallback to the browser thread.
+
+    The HTTP attempt runs on the lookup pool. If it finds no image, the page
+    and the returned Future are queued on browser_requests for the thread
+    that owns the Playwright browser to finish with _run_browser_lookups().
+    """
+    outcome: "Future[Optional[str]]" = Future()
+
+    def _on_http_done(lookup: Future):
+        try:
+            image_url = lookup.result()
+        except Exception:
+            image_url = None
+        if image_url:
+            outcome.set_result(image_url)
+        else:
+            browser_requests.put((artwork_url, outcome))
+
+    lookup_executor.submit(fetch_first_artwork_image_over_http, artwork_url).add_done_callback(_on_http_done)
+    return outcome
+
+
+def _run_browser_lookups(browser_requests: "queue.Queue[Tuple[str, Future]]", verbose: bool = True):
+    """Render every queued page in the browser and resolve its Future. Call on the browser thread."""
+    while True:
+        try:
+            artwork_url, outcome = browser_requests.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            outcome.set_result(fetch_first_artwork_image_in_browser(artwork_url))
+        except Exception as e:
+            if verbose:
+                print(f"✗ Error fetching artwork page {artwork_url}: {e}")
+            outcome.set_result(None)
+
 
 def yumebyo(
     folder_path: str,
@@ -15,11 +226,13 @@ def yumebyo(
     sources: Optional[List[str]] = None,
     country: Optional[str] = None,
     recursive: bool = True,
-    verbose: bool = True
+    verbose: bool = True,
+    max_workers: int = 8,
+    use_cover_cache: bool = True
 ) -> Dict[str, List[str]]:
     """
     Scan a folder for music files and embedd artwork from musichoarders.xyz and youtube.com for files without embedded artwork.
-    
+
     Args:
         folder_path: Path to the folder to scan
         musichoarders_base_url: Base URL for the artwork service from musichoarders.xyz
@@ -30,103 +243,156 @@ def yumebyo(
         country: Optional country code
         recursive: If True, scan subdirectories recursively
         verbose: If True, print progress information
-    
+        max_workers: Number of files downloaded and embedded concurrently
+        use_cover_cache: If True, reuse covers already downloaded for the same
+            artist and album, in this run or a previous one, and skip parsing
+            files that have not changed since a previous scan
+
     Returns:
         Dictionary with:
         - 'with_artwork': List of file paths that already have embedded artwork
         - 'without_artwork': List of file paths without embedded artwork
-        - 'artwork_urls_musichoarders': Dictionary mapping file paths to artwork URLs from MusicHoarders
+        - 'artwork_urls_musichoarders': Dictionary mapping file paths to the MusicHoarders
+          search URL looked up for them; files embedded from the cover cache have none
         - 'artwork_urls_youtube': Dictionary mapping file paths to artwork URLs from YouTube
     """
 
     if not MUTAGEN_AVAILABLE:
         raise ImportError("mutagen is required. Install it with: pip install mutagen")
-    
-    local_music_file_paths_list = get_local_music_file_paths(folder_path, recursive)
-    
+
+    # Files are processed independently, so listing order does not matter
+    local_music_file_paths_list = get_local_music_file_paths(folder_path, recursive, sort=False)
+
     results = {
         'with_artwork': [],
         'without_artwork': [],
         'artwork_urls_musichoarders': {}
     }
-    
+    # Files still without artwork, in scan order; a dict so that removing a
+    # file once it has been embedded does not scan a list
+    without_artwork: Dict[str, None] = {}
+
     if verbose:
         print(f"Found {len(local_music_file_paths_list)} music file(s). Scanning for embedded artwork...")
         print()
-    
-    for file_path in local_music_file_paths_list:
-        try:
-            if has_embedded_artwork(file_path):
+
+    # Page lookups read the page over plain HTTP on their own pool, overlapping with
+    # other lookups and with downloads and saves; a file is handed to the embed pool
+    # once its lookup is done. Pages that need the browser are rendered on this thread,
+    # as the sync Playwright API is bound to the thread that started it, while it waits
+    # for results. Downloads, embeds and the YouTube fallback run in the embed pool.
+    # Tracks that search the same page URL (all tracks of one album, or repeated
+    # artist/title pairs) reuse the first lookup, pending or finished.
+    image_urls_by_lookup: Dict[str, Union[str, "Future[Optional[str]]", None]] = {}
+    use_browser = is_browser_initialized()
+    browser_requests: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+    # Progress lines are collected and written in batches rather than printed one by one
+    log_lines: List[str] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as lookup_executor, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+
+        # Local tag reads (spread over processes for large libraries) are streamed in, and
+        # each file's lookup starts as soon as its tags are known, overlapping the network
+        # with the rest of the scan
+        for file_path, probe in iter_scan_library(local_music_file_paths_list, use_cache=use_cover_cache):
+            file_name = os.path.basename(file_path) if verbose else None
+
+            if use_browser:
+                _run_browser_lookups(browser_requests, verbose)
+
+            if isinstance(probe, Exception):
+                if verbose:
+                    log_lines.append(f"✗ {file_name} - Error processing: {probe}")
+                continue
+
+            has_artwork, metadata = probe
+
+            if has_artwork:
                 results['with_artwork'].append(file_path)
                 if verbose:
-                    print(f"✓ {os.path.basename(file_path)} - Already has embedded artwork")
-            else:
-                results['without_artwork'].append(file_path)
-                
-                # Extract metadata and build artwork URL for musichoarders.xyz
-                try:
-                    metadata = get_music_metadata(file_path)
-                    if metadata['artist'] or metadata['album']:
-
-                        musichoarders_artwork_url = build_musichoarders_url_with_params(
-                            sources=['spotify', 'applemusic'],
-                            artist=metadata['artist'],
-                            album=metadata['title']
-                        )
-
-                        results['artwork_urls_musichoarders'][file_path] = musichoarders_artwork_url
-
-                        if verbose:
-                            print(f"✗ {os.path.basename(file_path)} - No artwork")
-                            print(f"  Artist: {metadata['artist'] or 'N/A'}, Title: {metadata['title'] or 'N/A'}")
-                            print(f"  MusicHoarders Artwork URL: {musichoarders_artwork_url}")
-                        
-
-                        # Download and embed the artwork
-                        if verbose:
-                            print()
-
-                        success = download_and_embed_artwork(file_path, musichoarders_artwork_url)
-
-                        if not success:
-
-                            if metadata['artist'] is not None and "nightcore" in metadata['artist'].lower() or metadata['title'] is not None and "nightcore" in metadata['title'].lower():
-                                print(f"search in videos")
-                                filter_val = "videos"
-                            else:
-                                filter_val = "songs"
-                         
-                            youtube_thumbnail_url = get_thumbnail_url(
-                                artist=metadata['artist'],
-                                title=metadata['title'],
-                                filter=filter_val
-                            )
-
-                            success = download_and_embed_artwork_using_url(file_path, youtube_thumbnail_url)
-
-                        if success:
-                            results['with_artwork'].append(file_path)  # Move to with_artwork after embedding
-                            if file_path in results['without_artwork']:
-                                results['without_artwork'].remove(file_path)
-                        if verbose:
-                            print()
-                    else:
-                        if verbose:
-                            print(f"✗ {os.path.basename(file_path)} - No artwork (missing metadata)")
-                except Exception as e:
-                    if verbose:
-                        print(f"✗ {os.path.basename(file_path)} - Error extracting metadata: {e}")
-        
-        except Exception as e:
+                    log_lines.append(f"✓ {file_name} - Already has embedded artwork")
+                continue
+
+            without_artwork[file_path] = None
+
+            # The search needs at least an artist or a title; a file with neither
+            # would only produce an empty search
+            if not (metadata['artist'] or metadata['title']):
+                if verbose:
+                    log_lines.append(f"✗ {file_name} - No artwork (missing metadata)")
+                continue
+
             if verbose:
-                print(f"✗ {os.path.basename(file_path)} - Error processing: {e}")
-    
+                log_lines.append(f"✗ {file_name} - No artwork")
+                log_lines.append(f"  Artist: {metadata['artist'] or 'N/A'}, Title: {metadata['title'] or 'N/A'}")
+
+            album_key = _album_key(metadata)
+
+            cached_cover = get_cached_cover(*album_key) if use_cover_cache and album_key else None
+            if cached_cover:
+                if verbose:
+                    log_lines.append(f"  Using cached cover for album: {album_key[1]}")
+                futures.append(_submit_embed(
+                    executor, file_path, metadata, None, cached_cover, use_cover_cache
+                ))
+                continue
+
+            # Tracks with a known album search for the album itself, so the cover found
+            # is the same for every track of the album and can be stored under it in the
+            # cover cache; other tracks search by artist and title
+            musichoarders_artwork_url = build_musichoarders_search_url(
+                artist=metadata['artist'],
+                album=album_key[1] if album_key else metadata['title']
+            )
+            results['artwork_urls_musichoarders'][file_path] = musichoarders_artwork_url
+
+            if verbose:
+                log_lines.append(f"  MusicHoarders Artwork URL: {musichoarders_artwork_url}")
+                if len(log_lines) >= _LOG_FLUSH_LINES:
+                    _write_lines(log_lines)
+
+            if musichoarders_artwork_url in image_urls_by_lookup:
+                image_url = image_urls_by_lookup[musichoarders_artwork_url]
+            elif use_browser:
+                image_url = _lookup_with_browser_fallback(lookup_executor, musichoarders_artwork_url, browser_requests)
+                image_urls_by_lookup[musichoarders_artwork_url] = image_url
+            else:
+                image_url = lookup_executor.submit(fetch_first_artwork_image, musichoarders_artwork_url)
+                image_urls_by_lookup[musichoarders_artwork_url] = image_url
+            futures.append(_submit_embed(
+                executor, file_path, metadata, image_url, None, use_cover_cache
+            ))
+
+        _write_lines(log_lines)
+
+        if verbose and futures:
+            print()
+            print(f"Fetching artwork for {len(futures)} file(s)...")
+
+        pending = set(futures)
+        while pending:
+            if use_browser:
+                _run_browser_lookups(browser_requests, verbose)
+            # With a browser, wake up regularly to serve pages that fell back to it
+            done, pending = wait(pending, timeout=0.05 if use_browser else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path, success, message = future.result()
+                if success:
+                    results['with_artwork'].append(file_path)  # Move to with_artwork after embedding
+                    without_artwork.pop(file_path, None)
+                if verbose:
+                    log_lines.append(f"{'✓' if success else '✗'} {os.path.basename(file_path)} - {message}")
+            _write_lines(log_lines)
+
+    results['without_artwork'] = list(without_artwork)
+
     if verbose:
         print()
         print(f"Summary:")
         print(f"  Files with artwork: {len(results['with_artwork'])}")
         print(f"  Files without artwork: {len(results['without_artwork'])}")
         print(f"  Artwork URLs generated: {len(results['artwork_urls_musichoarders'])}")
-    
-    return results
 
+    return results